@@ -0,0 +1,122 @@
+"""Keyword CRUD ops/sec against a real Postgres: the old session-per-call path vs DatabaseManager.
+
+"before" is the add as app.py used to do it: keyword_exists() and add_keyword(),
+each in its own ORM session, on an engine with default pool settings. "after" is
+the current single-statement add_keyword() on the tuned pool. Removal and
+existence checks are measured for both as well. Both look keywords up by the
+indexed keyword_normalized column, so only the query shape and pool differ.
+
+Needs the DB_* variables of .env (run against a scratch database, test keywords
+are prefixed and removed afterwards).
+
+Usage: python benchmarks/bench_keyword_crud.py [--ops 2000] [--concurrency 1]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault('API_ID', '0')
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from dotenv import load_dotenv
+from sqlalchemy import delete, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from database import KEYWORDS_CHANNEL, DatabaseManager, ExcludedKeyword
+from keyword_matcher import normalize
+
+PREFIX = 'bench_crud_'
+
+
+class LegacyKeywords:
+    """The keyword methods as they were: a new ORM session and transaction per call.
+
+    Lookups use keyword_normalized, which now carries the unique index the keyword
+    column had, so "before" is not slowed down by sequential scans.
+    """
+
+    def __init__(self, dsn):
+        self.engine = create_async_engine(dsn.replace("postgresql://", "postgresql+asyncpg://", 1))
+        self.session_factory = async_sessionmaker(self.engine, expire_on_commit=False)
+
+    async def _notify(self, session, op, keyword):
+        payload = json.dumps({'origin': 'bench', 'op': op, 'keyword': keyword})
+        await session.execute(text("SELECT pg_notify(:channel, :payload)"),
+                               {'channel': KEYWORDS_CHANNEL, 'payload': payload})
+
+    async def keyword_exists(self, keyword):
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(ExcludedKeyword).where(ExcludedKeyword.keyword_normalized == normalize(keyword)))
+            return result.first() is not None
+
+    async def add_keyword(self, keyword):
+        # The POST endpoint: existence check, then insert
+        if await self.keyword_exists(keyword):
+            return False
+        async with self.session_factory() as session:
+            session.add(ExcludedKeyword(keyword=keyword, keyword_normalized=normalize(keyword)))
+            await self._notify(session, 'add', keyword)
+            await session.commit()
+            return True
+
+    async def remove_keyword(self, keyword):
+        async with self.session_factory() as session:
+            result = await session.execute(
+                delete(ExcludedKeyword).where(ExcludedKeyword.keyword_normalized == normalize(keyword)))
+            if result.rowcount > 0:
+                await self._notify(session, 'remove', keyword)
+            await session.commit()
+            return result.rowcount > 0
+
+    async def close(self):
+        await self.engine.dispose()
+
+
+async def timed(label, store, op, keywords, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(keyword):
+        async with semaphore:
+            await getattr(store, op)(keyword)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(keyword) for keyword in keywords))
+    elapsed = time.perf_counter() - started
+    print(f"{label:>8} {op:<16} {len(keywords) / elapsed:>10.0f} ops/sec")
+
+
+async def run(label, store, keywords, concurrency):
+    await timed(label, store, 'add_keyword', keywords, concurrency)
+    await timed(label, store, 'add_keyword', keywords, concurrency)  # all duplicates now
+    await timed(label, store, 'keyword_exists', keywords, concurrency)
+    await timed(label, store, 'remove_keyword', keywords, concurrency)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ops', type=int, default=2_000, help='keywords per operation')
+    parser.add_argument('--concurrency', type=int, default=1, help='operations in flight at once')
+    args = parser.parse_args()
+
+    load_dotenv()
+    manager = DatabaseManager()
+    await manager.initialize()
+    legacy = LegacyKeywords(manager._dsn())
+    keywords = [f"{PREFIX}{i}" for i in range(args.ops)]
+    print(f"{args.ops} keywords per operation, concurrency {args.concurrency}")
+    try:
+        await run('before', legacy, keywords, args.concurrency)
+        await run('after', manager, keywords, args.concurrency)
+    finally:
+        async with manager.engine.begin() as conn:
+            await conn.execute(delete(ExcludedKeyword).where(ExcludedKeyword.keyword.startswith(PREFIX)))
+        await legacy.close()
+        await manager.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,61 @@
+"""Micro-benchmark: KeywordMatcher vs the original per-keyword exclusion loop.
+
+Usage: python benchmarks/bench_keyword_matcher.py
+"""
+import os
+import random
+import string
+import sys
+import timeit
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from keyword_matcher import KeywordMatcher
+
+SIZES = [10, 1_000, 10_000]
+ALPHABET = string.ascii_lowercase + 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+
+MESSAGE = (
+    "**Новый заказ**\n"
+    "Адрес: ул. Ленина, д. 15, кв. 42\n"
+    "Описание: доставка мебели, подъём на 5 этаж, есть грузовой лифт. "
+    "Клиент просит позвонить за час до приезда.\n"
+    "**Сумма заказа:** 25000\n"
+) * 3
+
+
+def random_keyword(rng):
+    return ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(5, 14)))
+
+
+def legacy_loop(keywords, text):
+    """The exclusion check as it was written in text_contains_test"""
+    for keyword in keywords:
+        if keyword.strip() and keyword.strip().lower() in text.lower():
+            return keyword
+    return None
+
+
+def run(size, rng, number=200):
+    keywords = [random_keyword(rng) for _ in range(size)]
+    matcher = KeywordMatcher(keywords)
+    assert legacy_loop(keywords, MESSAGE) is None and matcher.find(MESSAGE) is None
+
+    legacy = min(timeit.repeat(lambda: legacy_loop(keywords, MESSAGE), number=number, repeat=3)) / number
+    compiled = min(timeit.repeat(lambda: matcher.find(MESSAGE), number=number, repeat=3)) / number
+    build = min(timeit.repeat(lambda: KeywordMatcher(keywords), number=1, repeat=3))
+    return legacy, compiled, build
+
+
+def main():
+    rng = random.Random(42)
+    print(f"Message length: {len(MESSAGE)} characters (no keyword hit, worst case)")
+    print(f"{'keywords':>10} {'legacy loop':>14} {'matcher':>14} {'speedup':>9} {'build':>12}")
+    for size in SIZES:
+        legacy, compiled, build = run(size, rng)
+        print(f"{size:>10} {legacy * 1e6:>11.1f} us {compiled * 1e6:>11.1f} us "
+              f"{legacy / compiled:>8.1f}x {build * 1e3:>9.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+"""Throughput and per-message latency of the message hot path: filters, keyword matcher, click and forward.
+
+Feeds a synthetic corpus of order messages (varying amounts, text lengths,
+excluded keyword hits and button presence) through handle_message, directly
+and through the MessageQueue, with in-process fakes for the Telegram client
+and the keyword store. No Telegram account or database needed.
+
+Usage: python benchmarks/bench_message_path.py [--messages 20000] [--keywords 1000] [--log]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault('API_ID', '0')
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from database import db_manager
+from dedup import MessageDeduplicator, RejectionCache
+from message_filters import build_pipeline
+from message_queue import MessageQueue
+from metrics import percentile
+from routing import Route
+from utils import TAKE_ORDER_BUTTON, handle_message
+
+CHAT_ID = -1001234567890
+ALPHABET = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+FILLER = "доставка мебели, подъём на 5 этаж, есть грузовой лифт, клиент просит позвонить за час. "
+
+
+class FakeButton:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeRow:
+    def __init__(self, buttons):
+        self.buttons = buttons
+
+
+class FakeMarkup:
+    def __init__(self, rows):
+        self.rows = rows
+
+
+class FakeMessage:
+    """The attributes of a Telethon Message the hot path reads, and a click() that only counts"""
+
+    def __init__(self, message_id, text, button):
+        self.id = message_id
+        self.text = text
+        self.date = None
+        self.sender_id = 1
+        self.reply_markup = FakeMarkup([FakeRow([FakeButton(TAKE_ORDER_BUTTON)])]) if button else None
+        self.buttons = self.reply_markup.rows if button else None
+        self.clicks = 0
+
+    async def click(self, text=None):
+        self.clicks += 1
+
+
+class FakeEvent:
+    def __init__(self, message):
+        self.message = message
+        self.chat_id = CHAT_ID
+        self.is_channel = True
+
+
+class FakeClient:
+    def __init__(self):
+        self.forwards = 0
+
+    async def forward_messages(self, peer, message):
+        self.forwards += 1
+
+
+class FakeBot:
+    """The slice of BotManager that handle_message uses"""
+
+    def __init__(self):
+        self.name = 'bench'
+        self.client = FakeClient()
+        self.claims = None
+        self.dedup = MessageDeduplicator(1000, 60)
+        self.rejections = RejectionCache(1000, 300)
+
+    def is_authorized(self):
+        return True
+
+    def is_racing(self):
+        return False
+
+    def mark_unauthorized(self, reason):
+        pass
+
+
+def random_keyword(rng):
+    return ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(5, 14)))
+
+
+def build_corpus(rng, count, keywords, hit_rate, button_rate, chatter_rate):
+    messages = []
+    for message_id in range(1, count + 1):
+        description = FILLER * rng.randint(1, 20)
+        if rng.random() < chatter_rate:
+            text = f"Коллеги, {description}"
+        else:
+            text = (f"**Новый заказ**\nАдрес: ул. Ленина, д. {message_id}\nОписание: {description}"
+                    f"**Сумма заказа:** {rng.randint(0, 50_000)}\n")
+        if rng.random() < hit_rate:
+            text += f"Комментарий: {rng.choice(keywords)}\n"
+        messages.append(FakeMessage(message_id, text, rng.random() < button_rate))
+    return messages
+
+
+async def run_direct(bot, route, messages):
+    """One message at a time, timing each handle_message call"""
+    latencies = []
+    started = time.perf_counter()
+    for message in messages:
+        begin = time.perf_counter()
+        await handle_message(bot, route, FakeEvent(message))
+        latencies.append((time.perf_counter() - begin) * 1000)
+    return time.perf_counter() - started, latencies
+
+
+async def run_queued(bot, route, messages, workers, burst):
+    """Bursts of messages through the MessageQueue, timed from submit() to the end of handling"""
+    latencies = []
+    drained = asyncio.Event()
+    submitted = {}
+
+    async def handler(event, route, trace):
+        await handle_message(bot, route, event, trace)
+        latencies.append((time.perf_counter() - submitted[event.message.id]) * 1000)
+        if len(latencies) == len(submitted):
+            drained.set()
+
+    queue = MessageQueue(handler, burst, workers, 500)
+    queue.start()
+    started = time.perf_counter()
+    for offset in range(0, len(messages), burst):
+        drained.clear()
+        for message in messages[offset:offset + burst]:
+            submitted[message.id] = time.perf_counter()
+            queue.submit(FakeEvent(message), route)
+        await drained.wait()
+    elapsed = time.perf_counter() - started
+    await queue.stop()
+    return elapsed, latencies
+
+
+def report(label, elapsed, latencies):
+    ordered = sorted(latencies)
+    print(f"{label:>8} {len(latencies) / elapsed:>12.0f} {percentile(ordered, 0.5) * 1000:>10.1f} "
+          f"{percentile(ordered, 0.99) * 1000:>10.1f} {ordered[-1] * 1000:>10.1f}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=20_000)
+    parser.add_argument('--keywords', type=int, default=1_000, help='excluded keywords in the fake store')
+    parser.add_argument('--hit-rate', type=float, default=0.1, help='share of messages with an excluded keyword')
+    parser.add_argument('--button-rate', type=float, default=0.8, help='share of messages with the order button')
+    parser.add_argument('--chatter-rate', type=float, default=0.2, help='share of messages that are not orders')
+    parser.add_argument('--threshold', type=int, default=10_000)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--burst', type=int, default=20, help='messages submitted at once in queued mode')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--log', action='store_true', help='keep INFO logging on (formatted, then discarded)')
+    args = parser.parse_args()
+
+    root = logging.getLogger()
+    root.handlers = [logging.NullHandler()]
+    root.setLevel(logging.WARNING)
+
+    rng = random.Random(args.seed)
+    keywords = [random_keyword(rng) for _ in range(args.keywords)]
+    # The in-memory snapshot the exclusion rule reads; nothing touches the database
+    db_manager._set_keyword_snapshot(keywords)
+    rules = [
+        {'type': 'amount_range', 'min': args.threshold + 1},
+        {'type': 'exclude_keywords'},
+    ]
+    if args.log:
+        handler = logging.StreamHandler(open(os.devnull, 'w'))
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        root.handlers = [handler]
+        root.setLevel(logging.INFO)
+
+    corpus = build_corpus(rng, args.messages, keywords, args.hit_rate, args.button_rate, args.chatter_rate)
+    print(f"{args.messages} messages, {args.keywords} excluded keywords, "
+          f"average length {sum(len(m.text) for m in corpus) // len(corpus)} characters")
+    print(f"{'mode':>8} {'msgs/sec':>12} {'p50 us':>10} {'p99 us':>10} {'max us':>10}")
+
+    # A pipeline per run, so each run's rule statistics are its own
+    pipelines = {}
+    for label, run in (
+        ('direct', lambda bot, route: run_direct(bot, route, corpus)),
+        ('queued', lambda bot, route: run_queued(bot, route, corpus, args.workers, args.burst)),
+    ):
+        bot = FakeBot()
+        pipeline = pipelines[label] = build_pipeline(rules)
+        route = Route(CHAT_ID, pipeline, [('target',)])
+        route.target_entities = ['target']
+        for message in corpus:
+            message.clicks = 0
+        elapsed, latencies = await run(bot, route)
+        report(label, elapsed, latencies)
+
+    clicked = sum(1 for message in corpus if message.clicks)
+    print(f"Per run: {clicked} orders clicked, {bot.client.forwards} forwarded")
+    for label, pipeline in pipelines.items():
+        print(f"Rules, {label} run:")
+        for stats in pipeline.stats():
+            print(f"  {stats['rule']:<18} calls {stats['calls']:>7} rejections {stats['rejections']:>7} "
+                  f"avg {stats['avg_us']:>6.2f} us")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -1,14 +1,14 @@
 -- Populate excluded_keywords table with initial data
-INSERT INTO excluded_keywords (keyword, created_at)
-SELECT keyword, NOW()
+-- (large lists are easier to load with POST /api/excluded_keywords/import).
+-- keyword_normalized must match the app's strip().casefold(); lower() does for plain text.
+INSERT INTO excluded_keywords (keyword, keyword_normalized, created_at)
+SELECT keyword, lower(btrim(keyword)), NOW()
 FROM (
-    VALUES 
+    VALUES
         ('test test'),
         ('test test1')
 ) AS t(keyword)
-WHERE NOT EXISTS (
-    SELECT 1 FROM excluded_keywords WHERE excluded_keywords.keyword = t.keyword
-);
+ON CONFLICT (keyword_normalized) DO NOTHING;
 
 -- Show total count
-SELECT COUNT(*) as total_keywords FROM excluded_keywords;
\ No newline at end of file
+SELECT COUNT(*) as total_keywords FROM excluded_keywords;
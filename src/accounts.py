@@ -0,0 +1,69 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+
+from bot import BotManager
+
+logger = logging.getLogger(__name__)
+
+
+class ClaimRegistry:
+    """Remembers which account took each order; the first successful claim wins"""
+
+    def __init__(self, max_size: int = 1000):
+        self._owners: "OrderedDict[Hashable, str]" = OrderedDict()
+        self._max_size = max_size
+
+    def claim(self, key: Hashable, account: str) -> bool:
+        owner = self._owners.get(key)
+        if owner is not None:
+            return owner == account
+        self._owners[key] = account
+        if len(self._owners) > self._max_size:
+            self._owners.popitem(last=False)
+        return True
+
+    def owner(self, key: Hashable) -> Optional[str]:
+        return self._owners.get(key)
+
+
+class AccountPool:
+    """All Telegram accounts run by this process, each with its own BotManager and connection"""
+
+    def __init__(self, names: List[str]):
+        self.claims = ClaimRegistry()
+        self.primary = names[0]
+        # Only coordinate clicks when several accounts race for the same orders
+        claims = self.claims if len(names) > 1 else None
+        self.accounts: Dict[str, BotManager] = {
+            name: BotManager(name, session_name=None if name == self.primary else name, claims=claims)
+            for name in names
+        }
+
+    def get(self, name: Optional[str] = None) -> BotManager:
+        bot = self.accounts.get(name or self.primary)
+        if bot is None:
+            raise Exception(f"Unknown account: {name}")
+        return bot
+
+    async def start_existing_sessions(self):
+        results = await asyncio.gather(*(bot.start_existing_session() for bot in self.accounts.values()))
+        started = [name for name, ok in zip(self.accounts, results) if ok]
+        logger.info(f"Accounts started from saved sessions: {', '.join(started) or 'none'}")
+
+    async def toggle_monitoring(self, name: Optional[str] = None) -> bool:
+        """Toggle one account, or all running accounts to the opposite of the primary's state"""
+        if name:
+            return await self.get(name).toggle_monitoring()
+        running = [bot for bot in self.accounts.values() if bot.is_running()]
+        if not running:
+            raise Exception("Bot is not running")
+        target = not self.get().is_monitoring()
+        for bot in running:
+            if bot.is_monitoring() != target:
+                await bot.toggle_monitoring()
+        return target
+
+    def status(self) -> Dict[str, Any]:
+        return {name: bot.status() for name, bot in self.accounts.items()}
@@ -3,45 +3,45 @@ import logging
 import asyncio
 from typing import Optional
 
-from quart import Quart, render_template, request, session, redirect, url_for, jsonify
-from bot import BotManager
+from quart import Quart, render_template, request, session, redirect, url_for, jsonify, make_response
+from accounts import AccountPool
 from config import Config
 from database import db_manager
+from metrics import metrics
+from log_tail import LOG_FILE, MAX_TAIL_LINES, read_tail
+from event_stream import broadcaster
+from keyword_io import MAX_KEYWORD_LENGTH, clean_keywords, export_lines, fits_columns, parse_keyword_file
+from logging_setup import configure_logging
 from auth_decorators import require_auth
 from hypercorn.config import Config as HyperConfig
 from hypercorn.asyncio import serve
 
-# Create logs directory if not exists and add a file handler for logging
-if not os.path.exists('logs'):
-    os.makedirs('logs')
-
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# Logging goes through a queue; file, console and stream handlers run on a background thread
+configure_logging()
 logger = logging.getLogger(__name__)
 
-# --- SET UP FILE HANDLER ---
-file_handler = logging.FileHandler('logs/app.log')
-file_handler.setLevel(logging.INFO)
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-file_handler.setFormatter(formatter)
-
-logging.getLogger().addHandler(file_handler)
-
 app = Quart(__name__)
 app.secret_key = os.getenv('ADMIN_SECRET', 'default_secret')  # Secret key for session management
-bot_manager: Optional[BotManager] = None
+accounts: Optional[AccountPool] = None
+# Seconds between keepalive comments on idle /api/stream connections
+STREAM_KEEPALIVE = 15
+# Default and largest page of GET /api/excluded_keywords; the full list is at /api/excluded_keywords/export
+KEYWORDS_PAGE_SIZE = 100
+KEYWORDS_PAGE_MAX = 500
 
 async def init_app():
-    global bot_manager
+    global accounts
     config = HyperConfig()
     config.bind = ["0.0.0.0:5000"]
+    broadcaster.bind_loop(asyncio.get_running_loop())
 
     # Initialize database first
     await db_manager.initialize()
     
-    # Initialize bot manager
-    bot_manager = BotManager()
-    # Try to start existing session
-    await bot_manager.start_existing_session()
+    # Initialize one bot manager per configured account
+    accounts = AccountPool(Config.ACCOUNTS)
+    # Try to start existing sessions
+    await accounts.start_existing_sessions()
 
     # Start the web server
     await serve(app, config)
@@ -77,9 +77,10 @@ async def index():
 async def login():
     try:
         data = await request.get_json()
-        phone = data.get('phone', Config.PHONE_NUMBER)
-        logger.info(f"Starting login process for phone: {phone}")
-        await bot_manager.start_login(phone)
+        phone = data.get('phone') or Config.PHONE_NUMBER
+        bot = accounts.get(data.get('account'))
+        logger.info(f"Starting login process for account '{bot.name}', phone: {phone}")
+        await bot.start_login(phone)
         return {'status': 'Code sent'}
     except Exception as e:
         logger.error(f"Login error: {e}")
@@ -93,8 +94,9 @@ async def verify():
         if not code:
             logger.error("Verification error: Code required")
             return {'error': 'Code required'}, 400
-        logger.info("Attempting to verify code...")
-        await bot_manager.verify_code(code)
+        bot = accounts.get(data.get('account'))
+        logger.info(f"Attempting to verify code for account '{bot.name}'...")
+        await bot.verify_code(code, data.get('password'))
         return {'status': 'Bot started'}
     except Exception as e:
         logger.error(f"Verification error: {e}")
@@ -103,10 +105,14 @@ async def verify():
 @app.route('/api/toggle_monitoring', methods=['POST'])
 async def toggle_monitoring():
     try:
-        if not bot_manager.is_running():
+        data = await request.get_json(silent=True) or {}
+        account = data.get('account')
+        if account and not accounts.get(account).is_running():
+            return {'error': 'Bot is not running'}, 400
+        if not account and not any(bot.is_running() for bot in accounts.accounts.values()):
             return {'error': 'Bot is not running'}, 400
 
-        is_monitoring = await bot_manager.toggle_monitoring()
+        is_monitoring = await accounts.toggle_monitoring(account)
 
         logger.info(f"Monitoring toggled to: {is_monitoring}")
 
@@ -117,29 +123,86 @@ async def toggle_monitoring():
 
 @app.route('/api/status')
 async def status():
+    # Top-level fields describe the primary account; 'accounts' has every account
     return {
-        'running': bot_manager.is_running(),
-        'monitoring': bot_manager.is_monitoring(),
-        'session_lost': bot_manager.is_session_lost()
+        **accounts.get().status(),
+        'accounts': accounts.status()
     }
 
+# Server-sent events: status transitions, new log lines and keyword changes
+@app.route('/api/stream')
+@require_auth
+async def stream():
+    async def send_events():
+        async with broadcaster.subscribe() as queue:
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=STREAM_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield b": keepalive\n\n"
+
+    response = await make_response(send_events(), {
+        'Content-Type': 'text/event-stream',
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    response.timeout = None
+    return response
+
+# Per-stage order latency percentiles and filter rule statistics
+@app.route('/api/metrics')
+async def get_metrics():
+    return {
+        'latency_ms': metrics.snapshot(),
+        'accounts': {
+            name: {
+                'filter_rules': {str(route.chat_id): route.pipeline.stats() for route in bot.routes},
+                'queue': bot.queue.stats(),
+                'dedup': bot.dedup.stats()
+            }
+            for name, bot in (accounts.accounts.items() if accounts else [])
+        }
+    }
+
+def _read_log_file():
+    with open(LOG_FILE, 'r') as f:
+        return f.read()
+
 # Serve application logs from the log file
 @app.route('/api/logs')
 async def get_logs():
     try:
-        with open('logs/app.log', 'r') as f:
-            log_data = f.read()
+        log_data = await asyncio.to_thread(_read_log_file)
         return {'logs': log_data}
     except Exception as e:
         return {'error': str(e)}, 500
 
+# Incremental log tail: only lines written after the given cursor
+@app.route('/api/logs/tail')
+@require_auth
+async def get_logs_tail():
+    try:
+        cursor = request.args.get('cursor')
+        max_lines = min(max(request.args.get('max_lines', 200, type=int), 1), MAX_TAIL_LINES)
+        return await asyncio.to_thread(read_tail, LOG_FILE, cursor, max_lines)
+    except Exception as e:
+        return {'error': str(e)}, 500
+
 # Excluded keywords API endpoints
 @app.route('/api/excluded_keywords', methods=['GET'])
 @require_auth
 async def get_excluded_keywords():
+    """One page of keywords, optionally only those starting with q; pass next_cursor back as cursor"""
+    try:
+        limit = min(max(int(request.args.get('limit', KEYWORDS_PAGE_SIZE)), 1), KEYWORDS_PAGE_MAX)
+    except ValueError:
+        return {'error': 'limit must be a number'}, 400
     try:
-        keywords = await db_manager.get_all_keywords()
-        return {'keywords': keywords}
+        keywords, next_cursor = await db_manager.search_keywords(
+            request.args.get('q', ''), request.args.get('cursor', ''), limit
+        )
+        return {'keywords': keywords, 'next_cursor': next_cursor}
     except Exception as e:
         logger.error(f"Error fetching excluded keywords: {e}")
         return {'error': str(e)}, 500
@@ -153,19 +216,68 @@ async def add_excluded_keyword():
         
         if not keyword:
             return {'error': 'Keyword is required'}, 400
+        if not fits_columns(keyword):
+            return {'error': f'Keyword is longer than {MAX_KEYWORD_LENGTH} characters'}, 400
         
-        if await db_manager.keyword_exists(keyword):
-            return {'error': 'Keyword already exists'}, 400
-        
-        success = await db_manager.add_keyword(keyword)
-        if success:
-            return {'message': 'Keyword added successfully'}
-        else:
+        created = await db_manager.add_keyword(keyword)
+        if created is None:
             return {'error': 'Failed to add keyword'}, 500
+        if not created:
+            return {'error': 'Keyword already exists'}, 400
+        return {'message': 'Keyword added successfully'}
     except Exception as e:
         logger.error(f"Error adding excluded keyword: {e}")
         return {'error': str(e)}, 500
 
+@app.route('/api/excluded_keywords/import', methods=['POST'])
+@require_auth
+async def import_excluded_keywords():
+    """Bulk add from a JSON array (or {"keywords": [...]}) or an uploaded CSV/text file"""
+    try:
+        if request.is_json:
+            data = await request.get_json()
+            raw = data.get('keywords') if isinstance(data, dict) else data
+            if not isinstance(raw, list):
+                return {'error': 'Expected a JSON array of keywords'}, 400
+        else:
+            upload = (await request.files).get('file')
+            if upload is None:
+                return {'error': 'Send a JSON array or upload a file'}, 400
+            is_csv = (upload.filename or '').lower().endswith('.csv') or upload.mimetype == 'text/csv'
+            raw = parse_keyword_file(upload.read().decode('utf-8-sig'), is_csv)
+
+        keywords, invalid = clean_keywords(raw)
+        created = await db_manager.add_keywords(keywords)
+        if created is None:
+            return {'error': 'Failed to import keywords'}, 500
+        return {'added': len(created), 'existing': len(keywords) - len(created), 'invalid': invalid}
+    except UnicodeDecodeError:
+        return {'error': 'File must be UTF-8 text'}, 400
+    except Exception as e:
+        logger.error(f"Error importing excluded keywords: {e}")
+        return {'error': str(e)}, 500
+
+@app.route('/api/excluded_keywords/export', methods=['GET'])
+@require_auth
+async def export_excluded_keywords():
+    as_csv = request.args.get('format', 'txt') == 'csv'
+
+    async def send_keywords():
+        try:
+            async for chunk in export_lines(db_manager.iter_keywords(), as_csv):
+                yield chunk
+        except Exception as e:
+            # Headers are already sent; the client sees a truncated file
+            logger.error(f"Error exporting excluded keywords: {e}")
+
+    extension = 'csv' if as_csv else 'txt'
+    response = await make_response(send_keywords(), {
+        'Content-Type': f"{'text/csv' if as_csv else 'text/plain'}; charset=utf-8",
+        'Content-Disposition': f'attachment; filename="excluded_keywords.{extension}"',
+    })
+    response.timeout = None
+    return response
+
 @app.route('/api/excluded_keywords/<keyword>', methods=['DELETE'])
 @require_auth
 async def remove_excluded_keyword(keyword: str):
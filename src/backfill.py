@@ -0,0 +1,105 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from config import Config
+from database import db_manager
+
+logger = logging.getLogger(__name__)
+
+
+class HistoryEvent:
+    """A message fetched from chat history, shaped like the NewMessage events the queue handles"""
+    __slots__ = ('message',)
+
+    def __init__(self, message):
+        self.message = message
+
+    @property
+    def chat_id(self):
+        return self.message.chat_id
+
+    @property
+    def is_channel(self):
+        return self.message.is_channel
+
+
+class ChatCursors:
+    """Highest message id handled per source chat of one account, persisted to the database.
+
+    mark_gap() freezes the positions at the moment live delivery stopped (startup,
+    disconnect, client swap); take_gap() then gives the id range that was missed in
+    each chat, bounded above by the first message received live afterwards.
+    """
+
+    def __init__(self, account: str):
+        self.account = account
+        self._last: Dict[int, int] = {}
+        self._gap_start: Optional[Dict[int, int]] = None
+        self._resumed_at: Dict[int, int] = {}
+        self._dirty = False
+        self._flush_task = None
+
+    async def load(self):
+        self._last = await db_manager.get_chat_cursors(self.account)
+        logger.info(f"Loaded message cursors for account '{self.account}': {len(self._last)} chat(s)")
+
+    def seen(self, chat_id: int, message_id: int, live: bool = True):
+        """Advance the cursor; only live messages bound an open gap, backfilled ones were not delivered"""
+        if live and self._gap_start is not None:
+            self._resumed_at.setdefault(chat_id, message_id)
+        if message_id > self._last.get(chat_id, 0):
+            self._last[chat_id] = message_id
+            self._dirty = True
+
+    def mark_gap(self):
+        if self._gap_start is None:
+            self._gap_start = dict(self._last)
+            self._resumed_at = {}
+
+    def take_gap(self) -> Dict[int, Tuple[int, int]]:
+        """Close the open gap and return its (min_id, max_id) per known chat, max_id 0 meaning up to the newest.
+
+        A mark_gap() while these ranges are being fetched opens a new gap for the next pass.
+        """
+        gaps = {chat_id: (min_id, self._resumed_at.get(chat_id, 0))
+                for chat_id, min_id in (self._gap_start or {}).items()}
+        self._gap_start = None
+        self._resumed_at = {}
+        return gaps
+
+    def start(self):
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_periodically())
+
+    async def stop(self):
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self.flush()
+
+    async def flush(self):
+        if not self._dirty:
+            return
+        self._dirty = False
+        if not await db_manager.save_chat_cursors(self.account, dict(self._last)):
+            self._dirty = True
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(Config.CURSOR_FLUSH_INTERVAL)
+            await self.flush()
+
+
+async def fetch_gap(client, chat_id: int, min_id: int, max_id: int = 0) -> List:
+    """Messages with min_id < id < max_id posted within BACKFILL_MAX_AGE, oldest first"""
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=Config.BACKFILL_MAX_AGE)
+    messages = []
+    # Newest first, so iteration stops at the first message too old to click
+    async for message in client.iter_messages(chat_id, min_id=min_id, max_id=max_id, limit=Config.BACKFILL_LIMIT):
+        if message.date < cutoff:
+            break
+        messages.append(message)
+    messages.reverse()
+    return messages
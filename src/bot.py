@@ -1,27 +1,60 @@
-from telethon import TelegramClient, events
+from telethon import TelegramClient, events, utils as telethon_utils
 from telethon.errors import SessionPasswordNeededError, SessionExpiredError
 from config import Config
-from utils import handle_message, text_contains_test
-from telegram_factory import TelegramClientFactory
+from utils import handle_message, handle_edit
+from message_queue import MessageQueue
+from routing import build_routes
+from backfill import ChatCursors, HistoryEvent, fetch_gap
+from dedup import MessageDeduplicator, RejectionCache
+from telegram_factory import AUTH_ERRORS, TelegramClientFactory
 from session_manager import SessionManager
+from event_stream import broadcaster
 import logging
 import asyncio
+import random
 
 logger = logging.getLogger(__name__)
 
+# Probe errors that say nothing about the session: reconnect and probe again, without counting a failure
+NETWORK_ERRORS = (ConnectionError, OSError, asyncio.TimeoutError)
+
 class BotManager:
-    def __init__(self):
+    def __init__(self, name='main', session_name=None, claims=None):
+        # Account name shown in the admin panel; session_name selects sessions/session_<name>.txt
+        self.name = name
+        self._session_name = session_name
+        # Shared ClaimRegistry when several accounts race for the same orders, None otherwise
+        self.claims = claims
         self.client = None
         self._running = False
         self._monitoring = False
         self.phone = None
         self.phone_code_hash = None
-        self._handler = None
+        # (callback, event builder) pairs registered on the client while monitoring
+        self._handlers = []
         self._connection_monitor_task = None
+        # Second connected client kept ready for recovery when WARM_STANDBY is on
+        self._standby = None
+        self._standby_task = None
         self._session_lost = False
+        # Last known authorization state, kept up to date by the monitor and RPC error handlers
+        self._authorized = False
         self._auth_failure_count = 0
         self._max_auth_failures = Config.MAX_AUTH_FAILURES
         self._retry_delay = Config.AUTH_RETRY_DELAY
+        # Set by mark_unauthorized() to run the next monitor probe right away
+        self._wake = asyncio.Event()
+        # Source chat titles seen by the health log; cleared on reconnect
+        self._group_titles = {}
+        self.routes = build_routes(Config.ROUTES)
+        # Route lookup by the chat id Telegram reports on events; refined when monitoring starts
+        self._routes_by_chat = {route.chat_id: route for route in self.routes}
+        self.cursors = ChatCursors(name)
+        self.dedup = MessageDeduplicator(Config.DEDUP_SIZE, Config.DEDUP_TEXT_TTL)
+        self.rejections = RejectionCache(Config.REJECTION_CACHE_SIZE, Config.EDIT_RECHECK_TTL)
+        self.queue = MessageQueue(self._handle_queued,
+                                  Config.MESSAGE_QUEUE_SIZE, Config.MESSAGE_WORKERS,
+                                  Config.MESSAGE_QUEUE_AGE_CAP_MS)
 
     def is_running(self):
         return self._running and self.client is not None and self.client.is_connected()
@@ -32,11 +65,135 @@ class BotManager:
     def is_session_lost(self):
         return self._session_lost
 
-    async def _diagnose_session_error(self):
+    def is_authorized(self):
+        return self._authorized
+
+    def is_racing(self):
+        return self.claims is not None
+
+    def status(self):
+        return {
+            'running': self.is_running(),
+            'monitoring': self.is_monitoring(),
+            'session_lost': self.is_session_lost(),
+            'authorized': self.is_authorized(),
+        }
+
+    def _publish_status(self):
+        """Push the account state to admin panels connected to /api/stream"""
+        broadcaster.publish('status', {'account': self.name, **self.status()})
+
+    def mark_unauthorized(self, reason):
+        """Called by RPC error handlers; wakes the monitor to re-check authorization now"""
+        if self._authorized:
+            logger.error(f"Authorization lost: {reason}")
+            self._authorized = False
+            self._publish_status()
+            self._wake.set()
+
+    async def resolve_target(self, route, index):
+        """Resolve one forward target of a route to an InputPeer, trying its candidates in order"""
+        for candidate in route.targets[index]:
+            try:
+                route.target_entities[index] = await self.client.get_input_entity(candidate)
+                logger.info(f"Forward target resolved: {candidate}")
+                return route.target_entities[index]
+            except Exception as e:
+                logger.warning(f"Could not resolve forward target {candidate}: {e}")
+        route.target_entities[index] = None
+        logger.error(f"Forward target {route.targets[index]} could not be resolved")
+        return None
+
+    async def resolve_targets(self):
+        """Resolve every route's forward targets once, so forwarding never resolves usernames inline"""
+        for route in self.routes:
+            for index in range(len(route.targets)):
+                await self.resolve_target(route, index)
+
+    async def _resolve_route_chats(self):
+        """Key routes by the marked chat id found on events, whatever form the config uses"""
+        routes_by_chat = {}
+        for route in self.routes:
+            try:
+                chat_id = telethon_utils.get_peer_id(await self.client.get_input_entity(route.chat_id))
+            except Exception as e:
+                logger.warning(f"Could not resolve source chat {route.chat_id}: {e}")
+                chat_id = route.chat_id
+            routes_by_chat[chat_id] = route
+        self._routes_by_chat = routes_by_chat
+
+    async def _diagnose_session_error(self, client=None):
         """Diagnose session authorization error and log details"""
-        error_diagnosis = await TelegramClientFactory.diagnose_session_error(self.client)
+        error_diagnosis = await TelegramClientFactory.diagnose_session_error(client or self.client)
         logger.error(f"Session error reason: {error_diagnosis}")
 
+    async def _open_client(self):
+        """Connect a new client from the saved session; None unless it is authorized"""
+        session_str = SessionManager.load_session('user', self._session_name)
+        if not session_str:
+            logger.error("Session file is empty or not found")
+            return None
+        client = await TelegramClientFactory.create_client(session_str)
+        if await TelegramClientFactory.check_authorization(client):
+            return client
+        logger.error("Saved session is not authorized")
+        await self._diagnose_session_error(client)
+        await client.disconnect()
+        return None
+
+    async def _switch_client(self, client):
+        """Make client the active one without a gap in event handling, then retire the previous client"""
+        old, self.client = self.client, client
+        # No await while moving the handlers, so no update is handled twice or missed in between
+        for callback, event in self._handlers:
+            client.add_event_handler(callback, event)
+            if old is not None:
+                old.remove_event_handler(callback)
+        # Forward targets are InputPeers and routes are keyed by marked ids, both valid on any
+        # client of this account; only targets that never resolved need an RPC
+        for route in self.routes:
+            for index, entity in enumerate(route.target_entities):
+                if entity is None:
+                    await self.resolve_target(route, index)
+        self._group_titles = {}
+        if old is not None:
+            try:
+                await old.disconnect()
+            except Exception as e:
+                logger.warning(f"Error disconnecting the replaced client: {e}")
+
+    def _start_standby(self):
+        if Config.WARM_STANDBY and self._standby is None and (self._standby_task is None or self._standby_task.done()):
+            self._standby_task = asyncio.create_task(self._prepare_standby())
+
+    async def _prepare_standby(self):
+        try:
+            client = await self._open_client()
+        except Exception as e:
+            logger.warning(f"Could not connect standby client for account '{self.name}': {e}")
+            return
+        if client is not None:
+            self._standby = client
+            logger.info(f"Warm standby client connected for account '{self.name}'")
+
+    async def _drop_standby(self):
+        if self._standby_task is not None:
+            self._standby_task.cancel()
+            self._standby_task = None
+        standby, self._standby = self._standby, None
+        if standby is not None:
+            await standby.disconnect()
+
+    def _handle_queued(self, event, route, trace):
+        if isinstance(event, events.MessageEdited.Event):
+            return handle_edit(self, route, event, trace)
+        return handle_message(self, route, event, trace)
+
+    def _remove_handlers(self):
+        for callback, _ in self._handlers:
+            self.client.remove_event_handler(callback)
+        self._handlers = []
+
     async def toggle_monitoring(self):
         if not self.is_running():
             raise Exception("Bot must be running to toggle monitoring")
@@ -44,21 +201,49 @@ class BotManager:
         self._monitoring = not self._monitoring
 
         if self._monitoring:
-            @self.client.on(events.NewMessage(chats=Config.SOURCE_GROUP_ID))
+            await self._resolve_route_chats()
+            self.queue.start()
+
+            # One registration per event type for all source chats; the route is a dict lookup per event
+            chats = list(self._routes_by_chat)
+
             async def forward_message(event):
-                logger.info("New message received, processing...")
-                await handle_message(self.client, event, text_contains_test)
-            self._handler = forward_message
+                route = self._routes_by_chat.get(event.chat_id)
+                if route is None:
+                    return
+                logger.info("New message received, queued for processing...")
+                self.cursors.seen(event.chat_id, event.message.id)
+                self.queue.submit(event, route)
+
+            async def recheck_edited(event):
+                route = self._routes_by_chat.get(event.chat_id)
+                if route is None:
+                    return
+                # Not handled yet: the queued copy is checked with the edited text
+                if self.queue.replace(event.chat_id, event.message):
+                    logger.info("Queued message was edited, replaced in the queue")
+                    return
+                # Only edits of recently rejected messages are worth a look
+                if self.rejections.get(event.chat_id, event.message.id) is None:
+                    return
+                logger.info("Rejected message was edited, queued for re-checking...")
+                self.queue.submit(event, route)
+
+            self._handlers = [(forward_message, events.NewMessage(chats=chats)),
+                              (recheck_edited, events.MessageEdited(chats=chats))]
+            for callback, event in self._handlers:
+                self.client.add_event_handler(callback, event)
             logger.info("Monitoring started")
         else:
-            if self._handler:
-                self.client.remove_event_handler(self._handler)
-                self._handler = None
+            self._remove_handlers()
+            await self.queue.stop()
             logger.info("Monitoring stopped")
 
+        self._publish_status()
         return self._monitoring
 
     async def start_login(self, phone):
+        await self._drop_standby()
         if self.client:
             await self.client.disconnect()
             self.client = None
@@ -67,9 +252,9 @@ class BotManager:
         self.phone = phone
         code_request = await self.client.send_code_request(phone)
         self.phone_code_hash = code_request.phone_code_hash
-        logger.info("Login initiated")
+        logger.info(f"Login initiated for account '{self.name}'")
 
-    async def verify_code(self, code):
+    async def verify_code(self, code, password=None):
         if not self.client:
             raise Exception("Must call start_login first")
 
@@ -82,161 +267,230 @@ class BotManager:
             )
         except SessionPasswordNeededError:
             logger.info("2FA password required, attempting to sign in with password...")
-            await self.client.sign_in(password=Config.PASSWORD_2FA)
+            await self.client.sign_in(password=password or Config.PASSWORD_2FA)
 
         session_str = self.client.session.save()
-        SessionManager.save_session(session_str, 'user')
+        SessionManager.save_session(session_str, 'user', self._session_name)
 
         self._running = True
         self._session_lost = False
+        self._authorized = True
+        await self.resolve_targets()
         # Start the unified connection monitor task
         self._connection_monitor_task = asyncio.create_task(self._monitor_and_keep_connection())
-        logger.info("Bot started successfully with new login")
-
+        self._start_standby()
+        logger.info(f"Bot started successfully with new login for account '{self.name}'")
+        self._publish_status()
+
+        # Orders posted while the bot was down are fetched once the live handler is in place
+        await self.cursors.load()
+        self.cursors.mark_gap()
+        self.cursors.start()
         is_monitoring = await self.toggle_monitoring()
         if is_monitoring:
             logger.info("Telethon group monitoring started")
         else:
             logger.error("Error starting Telethon group monitoring")
             raise Exception("Error starting Telethon group monitoring")
+        await self._backfill()
 
     async def _monitor_and_keep_connection(self):
-        logger.info(f"Starting connection monitor (detailed check interval: {Config.CONNECTION_CHECK_INTERVAL} seconds)")
-        last_health_log = 0
+        """Probe once per cycle; between probes sleep until the client disconnects or a handler reports an auth error"""
+        logger.info(f"Starting connection monitor for account '{self.name}' (check interval: {Config.CONNECTION_CHECK_INTERVAL}-{Config.CONNECTION_CHECK_MAX_INTERVAL} seconds)")
+        healthy_interval = Config.CONNECTION_CHECK_INTERVAL
         while True:
             if not self.client.is_connected():
-                logger.warning("Client disconnected; attempting to reconnect...")
-                try:
-                    await self.client.connect()
-                    logger.info("Reconnection successful")
-                except Exception as e:
-                    logger.error(f"Error during reconnection attempt: {e}")
-
-            # Detailed connection health check every CONNECTION_CHECK_INTERVAL seconds
-            current_time = asyncio.get_running_loop().time()
-            if current_time - last_health_log >= Config.CONNECTION_CHECK_INTERVAL:
-                # Check authorization with retry mechanism
-                auth_result = await self._check_authorization_with_retry()
-                if not auth_result:
-                    logger.error(f"Authorization failed after {self._max_auth_failures} attempts")
-                    self._session_lost = True
-                    self._running = False
-                    self._monitoring = False
-                    # Stop monitoring handler if it exists
-                    if self._handler:
-                        self.client.remove_event_handler(self._handler)
-                        self._handler = None
-                    logger.error("Session lost - bot stopped, please re-authenticate")
-                    break
-                
-                try:
-                    me = await self.client.get_me()
-                    if me is not None:
-                        logger.info(f"1 - Logged as {me.first_name}")
-                    else:
-                        logger.error("1 - User info is None - authorization issue")
-                except Exception as e:
-                    logger.error(f"Health check error: {e}")
-
-                # Check for group existence and membership 
-                try:
-                    group = await self.client.get_entity(Config.SOURCE_GROUP_ID)
-                    # If group exists, attempt to retrieve its title
-                    group_title = getattr(group, 'title', 'Unknown Group')
-                    logger.info(f"2 - Membership in: '{group_title}'")
-                except Exception as e:
-                    logger.error(f"Group check error: {e}")
-
-                logger.info(f"3 - Is running: '{self._running}'")
-                logger.info(f"4 - Monitoring: '{self._monitoring}'")
+                await self._reconnect()
+                await self._backfill()
+                healthy_interval = Config.CONNECTION_CHECK_INTERVAL
 
-                last_health_log = current_time
+            try:
+                healthy = await self._probe()
+            except NETWORK_ERRORS as e:
+                # Returns at once if the client is disconnected, which is then reconnected above
+                logger.warning(f"Authorization check interrupted by a network error: {e!r}")
+                healthy_interval = Config.CONNECTION_CHECK_INTERVAL
+                await self._wait_for_next_check(self._retry_delay)
+                continue
+
+            if healthy:
+                interval = healthy_interval
+                # Probe less often the longer the connection stays healthy
+                healthy_interval = min(healthy_interval * 2, Config.CONNECTION_CHECK_MAX_INTERVAL)
+            elif self._auth_failure_count >= self._max_auth_failures:
+                logger.error(f"Authorization failed after {self._auth_failure_count} attempts")
+                await self._stop_after_session_lost()
+                break
+            else:
+                interval = self._retry_delay
+                healthy_interval = Config.CONNECTION_CHECK_INTERVAL
 
-            await asyncio.sleep(1)
+            await self._wait_for_next_check(interval)
 
-    async def _check_authorization_with_retry(self):
-        """Check authorization with retry mechanism using real API call instead of is_user_authorized()"""
-        for attempt in range(self._max_auth_failures):
+    async def _wait_for_next_check(self, interval):
+        """Return after interval seconds, or earlier on disconnect or mark_unauthorized()"""
+        disconnected = self.client.disconnected
+        woken = asyncio.ensure_future(self._wake.wait())
+        try:
+            await asyncio.wait({disconnected, woken}, timeout=interval, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            woken.cancel()
+            disconnected.cancel()
+            self._wake.clear()
+
+    async def _reconnect(self):
+        """Reconnect with exponential backoff and full jitter until the client is connected again"""
+        logger.warning("Client disconnected; attempting to reconnect...")
+        self.cursors.mark_gap()
+        self._publish_status()
+        delay = 1
+        attempt = 0
+        while not self.client.is_connected():
+            attempt += 1
             try:
-                # Use get_me() instead of is_user_authorized() for reliable check
-                me = await self.client.get_me()
-                if me is not None:
-                    # Reset failure count on success
-                    self._auth_failure_count = 0
-                    logger.debug(f"Authorization check successful - user: {me.first_name}")
-                    return True
-                else:
-                    logger.warning(f"Authorization check failed - get_me() returned None (attempt {attempt + 1}/{self._max_auth_failures})")
-                
+                await self.client.connect()
             except Exception as e:
-                logger.warning(f"Authorization check failed with error (attempt {attempt + 1}/{self._max_auth_failures}): {e}")
-                
-                # Check if it's a recoverable error
-                error_str = str(e)
-                if any(recoverable in error_str for recoverable in [
-                    "AuthKeyUnregistered", "SessionExpired", "SessionRevoked", 
-                    "ConnectionError", "TimeoutError", "NetworkError"
-                ]):
-                    # If not the last attempt, try to recover
-                    if attempt < self._max_auth_failures - 1:
-                        logger.info("Attempting session recovery for recoverable error...")
-                        if await self._attempt_session_recovery():
-                            logger.info("Session recovery successful")
-                            self._auth_failure_count = 0
-                            return True
-                        
-                        logger.warning(f"Session recovery failed, waiting {self._retry_delay} seconds before retry...")
-                        await asyncio.sleep(self._retry_delay)
+                wait = random.uniform(0, delay)
+                logger.error(f"Reconnection attempt {attempt} failed: {e}; retrying in {wait:.1f} seconds")
+                await asyncio.sleep(wait)
+                delay = min(delay * 2, Config.RECONNECT_MAX_DELAY)
+        logger.info(f"Reconnection successful after {attempt} attempt(s)")
+        # Memberships may have changed while offline
+        self._group_titles = {}
+        self._publish_status()
+
+    async def _probe(self):
+        """The single get_me() of a monitor cycle; its result updates the auth state and the health log.
+
+        NETWORK_ERRORS propagate to the monitor. A None user or one of AUTH_ERRORS counts toward
+        MAX_AUTH_FAILURES, with a session recovery attempt after each failure below the limit;
+        any other error is retried without counting.
+        """
+        try:
+            # Always a fresh request, shared with any lookup already in flight
+            me = await TelegramClientFactory.get_me(self.client, max_age=0)
+            error = None if me is not None else "get_me() returned None"
+        except NETWORK_ERRORS:
+            raise
+        except AUTH_ERRORS as e:
+            me, error = None, e
+        except Exception as e:
+            logger.error(f"Authorization check failed with an unexpected error, retrying in {self._retry_delay} seconds: {e!r}")
+            return False
+        first_name = (me.first_name or 'User') if me is not None else None
+
+        if first_name is None:
+            self._auth_failure_count += 1
+            logger.warning(f"Authorization check failed (attempt {self._auth_failure_count}/{self._max_auth_failures}): {error}")
+            if self._auth_failure_count < self._max_auth_failures:
+                logger.info("Attempting session recovery...")
+                user_info = await self._attempt_session_recovery()
+                if user_info:
+                    first_name = user_info['first_name']
                 else:
-                    logger.error(f"Non-recoverable authorization error: {e}")
-                    break
-        
-        self._auth_failure_count = self._max_auth_failures
-        return False
-    
+                    logger.warning(f"Session recovery failed, retrying in {self._retry_delay} seconds")
+            if first_name is None:
+                if self._authorized:
+                    self._authorized = False
+                    self._publish_status()
+                return False
+
+        self._auth_failure_count = 0
+        if not self._authorized:
+            self._authorized = True
+            self._publish_status()
+        await self._log_health(first_name)
+        return True
+
+    async def _log_health(self, first_name):
+        logger.info(f"1 - Account '{self.name}' logged as {first_name}")
+        # Group membership only needs an RPC after (re)connecting; later cycles reuse the titles
+        for route in self.routes:
+            title = self._group_titles.get(route.chat_id)
+            if title is None:
+                try:
+                    group = await self.client.get_entity(route.chat_id)
+                    title = self._group_titles[route.chat_id] = getattr(group, 'title', 'Unknown Group')
+                except Exception as e:
+                    logger.error(f"Group check error for {route.chat_id}: {e}")
+                    continue
+            logger.info(f"2 - Membership in: '{title}'")
+        logger.info(f"3 - Is running: '{self._running}'")
+        logger.info(f"4 - Monitoring: '{self._monitoring}'")
+
+    async def _backfill(self):
+        """Queue messages missed since cursors.mark_gap(), through the same filter and click path as live ones"""
+        # Taken before any await: a disconnect while fetching opens a new gap, left for the pass after reconnecting
+        gaps = self.cursors.take_gap()
+        if not self._monitoring or Config.BACKFILL_MAX_AGE <= 0:
+            return
+        for chat_id, route in self._routes_by_chat.items():
+            gap = gaps.get(chat_id)
+            if gap is None:
+                continue
+            try:
+                messages = await fetch_gap(self.client, chat_id, *gap)
+            except Exception as e:
+                logger.error(f"Backfill of chat {chat_id} failed: {e}")
+                continue
+            if messages:
+                logger.info(f"Backfilling {len(messages)} message(s) missed in chat {chat_id}")
+            for message in messages:
+                self.cursors.seen(chat_id, message.id, live=False)
+                self.queue.submit(HistoryEvent(message), route, 'backfill_delivery')
+
+    async def _stop_after_session_lost(self):
+        self._session_lost = True
+        self._running = False
+        self._monitoring = False
+        self._remove_handlers()
+        await self.queue.stop()
+        await self.cursors.stop()
+        await self._drop_standby()
+        logger.error(f"Session lost for account '{self.name}' - bot stopped, please re-authenticate")
+        self._publish_status()
+
     async def _attempt_session_recovery(self):
-        """Attempt to recover session by reconnecting with existing session file"""
+        """Swap in a validated client for the saved session; returns the user info on success.
+
+        The current client keeps receiving updates until the replacement is ready.
+        """
         try:
             logger.info("Attempting to recover session from file...")
-            
-            # Read existing session using SessionManager
-            session_str = SessionManager.load_session('user')
-            
-            if not session_str:
-                logger.error("Session file is empty or not found")
-                return False
-            
-            # Disconnect current client
-            if self.client and self.client.is_connected():
-                await self.client.disconnect()
-            
-            # Create new client with saved session using factory
-            self.client = await TelegramClientFactory.create_client(session_str)
-            
-            # Test session with factory method
-            if await TelegramClientFactory.check_authorization(self.client):
-                user_info = await TelegramClientFactory.get_user_info(self.client)
-                name = user_info['first_name'] if user_info else 'User'
-                logger.info(f"Session recovery successful - authenticated as {name}")
-                return True
-            else:
+            self.cursors.mark_gap()
+
+            # Prefer the warm standby; fall back to connecting a new client
+            standby, self._standby = self._standby, None
+            if standby is not None and not await TelegramClientFactory.check_authorization(standby):
+                logger.warning("Warm standby client is not authorized, connecting a new one")
+                await standby.disconnect()
+                standby = None
+            if standby is None:
+                standby = await self._open_client()
+            if standby is None:
                 logger.error("Session recovery failed - authorization check failed")
-                await self._diagnose_session_error()
                 return False
-                
+
+            user_info = await TelegramClientFactory.get_user_info(standby)
+            name = user_info['first_name'] if user_info else 'User'
+            await self._switch_client(standby)
+            logger.info(f"Session recovery successful - authenticated as {name}")
+            await self._backfill()
+            self._start_standby()
+            return user_info or {'first_name': name}
+
         except Exception as e:
             logger.error(f"Error during session recovery: {e}")
             return False
 
-
     async def start_existing_session(self):
         """Start bot with existing session if available"""
         try:
             # Load existing session using SessionManager
-            session_str = SessionManager.load_session('user')
+            session_str = SessionManager.load_session('user', self._session_name)
             
             if not session_str:
-                logger.error("No session file found")
+                logger.error(f"No session file found for account '{self.name}'")
                 return False
                 
             logger.info("Session file found, attempting to use existing session...")
@@ -256,20 +510,29 @@ class BotManager:
                 logger.error("Existing session is not authorized")
                 await self._diagnose_session_error()
                 self._session_lost = True
+                self._publish_status()
                 return False
 
             self._running = True
             self._session_lost = False
+            self._authorized = True
+            await self.resolve_targets()
             # Start the unified connection monitor task
             self._connection_monitor_task = asyncio.create_task(self._monitor_and_keep_connection())
-            logger.info("Telethon started successfully with existing session")
+            self._start_standby()
+            logger.info(f"Telethon started successfully with existing session for account '{self.name}'")
 
+            # Orders posted while the bot was down are fetched once the live handler is in place
+            await self.cursors.load()
+            self.cursors.mark_gap()
+            self.cursors.start()
             is_monitoring = await self.toggle_monitoring()
             if is_monitoring:
                 logger.info("Telethon group monitoring started")
             else:
                 logger.error("Error starting Telethon group monitoring")
                 raise Exception("Error starting Telethon group monitoring")
+            await self._backfill()
 
             return True
 
@@ -1,4 +1,5 @@
 import os
+import json
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -8,32 +9,80 @@ class Config:
     API_HASH = os.getenv('API_HASH')
     PHONE_NUMBER = os.getenv('PHONE_NUMBER')
     PASSWORD_2FA = os.getenv('2FA_PASSWORD')
-    SOURCE_GROUP_ID = int(os.getenv('SOURCE_GROUP_ID'))
-    TARGET_USER_ID = int(os.getenv('TARGET_USER_ID'))
+    # Account names run in this process; the first one uses sessions/session.txt
+    ACCOUNTS = [name.strip() for name in os.getenv('ACCOUNTS', 'main').split(',') if name.strip()] or ['main']
+    # Single source/target setup; optional when ROUTES is set
+    SOURCE_GROUP_ID = int(os.getenv('SOURCE_GROUP_ID') or 0)
+    TARGET_USER_ID = int(os.getenv('TARGET_USER_ID') or 0)
     TARGET_USER_NICKNAME = os.getenv('TARGET_USER_NICKNAME')
     ORDER_AMOUNT_THRESHOLD = int(os.getenv('ORDER_AMOUNT_THRESHOLD', 10000))
+    # Message filter rules as a JSON list; empty means amount above threshold + excluded keywords
+    FILTER_RULES = json.loads(os.getenv('FILTER_RULES') or '[]')
+    # Routing table as a JSON list of source chats; empty means the single SOURCE_GROUP_ID route
+    ROUTES = json.loads(os.getenv('ROUTES') or '[]')
+    # 'concurrent' forwards while the click is in flight, 'after_click' waits for the bot's answer first
+    FORWARD_MODE = os.getenv('FORWARD_MODE', 'concurrent')
+    # Bounded queue between the Telegram event handler and the message workers
+    MESSAGE_QUEUE_SIZE = int(os.getenv('MESSAGE_QUEUE_SIZE', 100))
+    MESSAGE_WORKERS = int(os.getenv('MESSAGE_WORKERS', 4))
+    # Queued messages are served by amount, unless one has waited longer than this (ms)
+    MESSAGE_QUEUE_AGE_CAP_MS = int(os.getenv('MESSAGE_QUEUE_AGE_CAP_MS', 500))
+    # Missed messages fetched after a restart or reconnect: only those younger than
+    # BACKFILL_MAX_AGE seconds (0 disables backfill), at most BACKFILL_LIMIT per chat
+    BACKFILL_MAX_AGE = int(os.getenv('BACKFILL_MAX_AGE', 300))
+    BACKFILL_LIMIT = int(os.getenv('BACKFILL_LIMIT', 500))
+    # Seconds between writes of the last handled message id per chat
+    CURSOR_FLUSH_INTERVAL = int(os.getenv('CURSOR_FLUSH_INTERVAL', 5))
+    # Handled messages remembered per account by id (LRU size), and by text for DEDUP_TEXT_TTL seconds
+    DEDUP_SIZE = int(os.getenv('DEDUP_SIZE', 1000))
+    DEDUP_TEXT_TTL = int(os.getenv('DEDUP_TEXT_TTL', 60))
+    # Seconds after a rejection during which an edit of the message is checked again, and rejections kept per account
+    EDIT_RECHECK_TTL = int(os.getenv('EDIT_RECHECK_TTL', 300))
+    REJECTION_CACHE_SIZE = int(os.getenv('REJECTION_CACHE_SIZE', 1000))
     # check interval in seconds (default is 300 seconds = 5 minutes)
     CONNECTION_CHECK_INTERVAL = int(os.getenv('CONNECTION_CHECK_INTERVAL', 300))
+    # While healthy the check interval doubles each cycle up to this many seconds
+    CONNECTION_CHECK_MAX_INTERVAL = int(os.getenv('CONNECTION_CHECK_MAX_INTERVAL', 1200))
+    # Upper bound in seconds for the exponential backoff between reconnection attempts
+    RECONNECT_MAX_DELAY = int(os.getenv('RECONNECT_MAX_DELAY', 60))
+    # Seconds a get_me() result (or error) is reused by authorization checks
+    ME_CACHE_TTL = float(os.getenv('ME_CACHE_TTL', 5))
+    # Keep a second connected client per account so session recovery is a swap, not a reconnect
+    WARM_STANDBY = os.getenv('WARM_STANDBY', 'false').lower() == 'true'
     
     # Authorization retry settings
     MAX_AUTH_FAILURES = int(os.getenv('MAX_AUTH_FAILURES', 3))
     AUTH_RETRY_DELAY = int(os.getenv('AUTH_RETRY_DELAY', 10))
     
+    # In-process fake Telegram for load testing (see src/fake_telegram.py); never enable in production
+    FAKE_TELEGRAM = os.getenv('FAKE_TELEGRAM', 'false').lower() == 'true'
+    FAKE_TELEGRAM_RATE = float(os.getenv('FAKE_TELEGRAM_RATE', 1))  # messages per second over all source chats
+    FAKE_TELEGRAM_LATENCY_MS = float(os.getenv('FAKE_TELEGRAM_LATENCY_MS', 50))  # mean per request and delivery
+    FAKE_TELEGRAM_FLOOD_RATE = float(os.getenv('FAKE_TELEGRAM_FLOOD_RATE', 0))  # share of clicks/forwards hitting FloodWait
+    FAKE_TELEGRAM_DISCONNECT_EVERY = int(os.getenv('FAKE_TELEGRAM_DISCONNECT_EVERY', 0))  # seconds, 0 = never
+    FAKE_TELEGRAM_REVOKE_AFTER = int(os.getenv('FAKE_TELEGRAM_REVOKE_AFTER', 0))  # seconds, 0 = never
+    FAKE_TELEGRAM_SEED = int(os.getenv('FAKE_TELEGRAM_SEED', 42))
+
+    # Logging: level, file format ('text' or 'json'), size-based rotation of logs/app.log
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')
+    LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', 10 * 1024 * 1024))
+    LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', 5))
+    # Fraction of sub-WARNING records kept per logger, e.g. "utils=0.1,message_queue=0.5"
+    LOG_SAMPLING = os.getenv('LOG_SAMPLING', '')
+    
     # Database configuration
     DB_HOST = os.getenv('DB_HOST', 'localhost')
     DB_PORT = int(os.getenv('DB_PORT_INTERNAL', 5432))
     DB_NAME = os.getenv('DB_NAME', 'tgbot')
     DB_USER = os.getenv('DB_USER', 'tgbot_user')
     DB_PASSWORD = os.getenv('DB_PASSWORD', 'tgbot_secure_2024')
-    
-    @classmethod
-    async def get_excluded_keywords(cls):
-        """Get excluded keywords from database"""
-        try:
-            from database import db_manager
-            return await db_manager.get_all_keywords()
-        except Exception as e:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"Error getting excluded keywords: {e}")
-            return []
+    # Connection pool: kept connections, extra ones under load, max connection age in seconds,
+    # liveness check on checkout, prepared statements cached per connection (0 = off, e.g. behind pgbouncer)
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    DB_STATEMENT_CACHE_SIZE = int(os.getenv('DB_STATEMENT_CACHE_SIZE', 256))
+    # Fallback refresh interval for the in-memory keyword snapshot, in seconds
+    KEYWORDS_CACHE_TTL = int(os.getenv('KEYWORDS_CACHE_TTL', 60))
@@ -1,14 +1,24 @@
 import os
+import json
+import uuid
 import asyncio
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import asyncpg
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
-from sqlalchemy import String, DateTime, select, delete
+from sqlalchemy import BigInteger, String, DateTime, Index, select, delete, text, func, bindparam, literal
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from datetime import datetime
+from config import Config
+from keyword_matcher import KeywordMatcher, normalize
+from event_stream import broadcaster
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Postgres channel used to tell other instances that the keyword set changed
+KEYWORDS_CHANNEL = "excluded_keywords_changed"
+
 
 class Base(DeclarativeBase):
     pass
@@ -16,97 +26,373 @@ class Base(DeclarativeBase):
 
 class ExcludedKeyword(Base):
     __tablename__ = "excluded_keywords"
+    # Unique per normalized form, so "Spam" and "spam" are one keyword; the
+    # "C" collation orders by code point, which makes prefix search a range scan
+    __table_args__ = (Index("ix_excluded_keywords_keyword_normalized", "keyword_normalized", unique=True),)
     
     id: Mapped[int] = mapped_column(primary_key=True)
-    keyword: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
+    keyword: Mapped[str] = mapped_column(String(255), nullable=False)
+    keyword_normalized: Mapped[str] = mapped_column(String(255, collation="C"), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
 
+def _prefix_end(prefix: str) -> Optional[str]:
+    """Smallest string above every string starting with prefix, in code point order"""
+    prefix = prefix.rstrip(chr(0x10FFFF))
+    if not prefix:
+        return None
+    code = ord(prefix[-1]) + 1
+    # Surrogates cannot be encoded; the next valid code point is just as good
+    return prefix[:-1] + chr(0xE000 if code == 0xD800 else code)
+
+
+class ChatCursor(Base):
+    """Last message id handled per account and source chat, the starting point for gap backfill"""
+    __tablename__ = "chat_cursors"
+
+    account: Mapped[str] = mapped_column(String(64), primary_key=True)
+    chat_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    last_message_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
 class DatabaseManager:
     def __init__(self):
         self.engine = None
         self.session_factory = None
+        self._autocommit_engine = None
         self._initialized = False
+        # Immutable in-memory copy of the excluded keywords, replaced as a whole on every change
+        self._keyword_snapshot: Tuple[str, ...] = ()
+        self._keyword_matcher = KeywordMatcher(())
+        self._keyword_listener = None
+        self._keyword_refresh_task = None
+        # Refreshes started by notifications; referenced here so they are not garbage-collected mid-flight
+        self._notification_tasks = set()
+        self._instance_id = uuid.uuid4().hex
+
+    @staticmethod
+    def _dsn() -> str:
+        return (
+            f"postgresql://{os.getenv('DB_USER')}:"
+            f"{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST')}:"
+            f"{os.getenv('DB_PORT_INTERNAL', '5432')}/{os.getenv('DB_NAME')}"
+        )
     
     async def initialize(self):
         if self._initialized:
             return
             
-        db_url = (
-            f"postgresql+asyncpg://{os.getenv('DB_USER')}:"
-            f"{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST')}:"
-            f"{os.getenv('DB_PORT_INTERNAL', '5432')}/{os.getenv('DB_NAME')}"
-        )
+        db_url = self._dsn().replace("postgresql://", "postgresql+asyncpg://", 1)
         
-        self.engine = create_async_engine(db_url, echo=False)
+        self.engine = create_async_engine(
+            db_url,
+            echo=False,
+            pool_size=Config.DB_POOL_SIZE,
+            max_overflow=Config.DB_MAX_OVERFLOW,
+            pool_recycle=Config.DB_POOL_RECYCLE,
+            pool_pre_ping=Config.DB_POOL_PRE_PING,
+            # Server-side prepared statements, cached per connection by asyncpg and by the dialect
+            connect_args={
+                'statement_cache_size': Config.DB_STATEMENT_CACHE_SIZE,
+                'prepared_statement_cache_size': Config.DB_STATEMENT_CACHE_SIZE,
+            },
+        )
         self.session_factory = async_sessionmaker(self.engine, expire_on_commit=False)
+        # Same pool without BEGIN/COMMIT, for the single-statement queries below
+        self._autocommit_engine = self.engine.execution_options(isolation_level='AUTOCOMMIT')
         
         # Create tables if they don't exist
         async with self.engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+            await self._normalize_keywords(conn)
         
         self._initialized = True
         logger.info("Database initialized successfully")
+
+        # Load the keyword snapshot and keep it in sync with other instances
+        await self.refresh_keywords()
+        await self._start_keyword_listener()
+        self._keyword_refresh_task = asyncio.create_task(self._refresh_keywords_periodically())
     
+    @staticmethod
+    async def _normalize_keywords(conn):
+        """Upgrade an excluded_keywords table created before keyword_normalized existed.
+
+        The column is filled in Python, with the matcher's normalize(), since
+        Postgres has no casefold(). Of keywords differing only in case or
+        surrounding spaces the oldest is kept.
+        """
+        # Instances starting together wait here; released at commit
+        await conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('excluded_keywords_normalized'))"))
+        exists = await conn.scalar(text(
+            "SELECT 1 FROM information_schema.columns "
+            "WHERE table_name = 'excluded_keywords' AND column_name = 'keyword_normalized'"
+        ))
+        if exists:
+            return
+
+        await conn.execute(text('ALTER TABLE excluded_keywords ADD COLUMN keyword_normalized VARCHAR(255) COLLATE "C"'))
+        rows = (await conn.execute(text("SELECT id, keyword FROM excluded_keywords ORDER BY id"))).all()
+        taken = set()
+        updates, duplicates = [], []
+        for row_id, keyword in rows:
+            normalized = normalize(keyword)
+            if normalized in taken:
+                duplicates.append(row_id)
+            else:
+                taken.add(normalized)
+                updates.append({'id': row_id, 'normalized': normalized})
+        if duplicates:
+            await conn.execute(text("DELETE FROM excluded_keywords WHERE id = ANY(:ids)"), {'ids': duplicates})
+        if updates:
+            await conn.execute(text("UPDATE excluded_keywords SET keyword_normalized = :normalized WHERE id = :id"), updates)
+        await conn.execute(text("ALTER TABLE excluded_keywords ALTER COLUMN keyword_normalized SET NOT NULL"))
+        await conn.execute(text(
+            "CREATE UNIQUE INDEX ix_excluded_keywords_keyword_normalized ON excluded_keywords (keyword_normalized)"
+        ))
+        await conn.execute(text("ALTER TABLE excluded_keywords DROP CONSTRAINT IF EXISTS excluded_keywords_keyword_key"))
+        logger.info(f"Normalized {len(updates)} excluded keywords, removed {len(duplicates)} case duplicates")
+
     async def get_session(self) -> AsyncSession:
         if not self._initialized:
             await self.initialize()
         return self.session_factory()
+
+    async def _execute(self, stmt) -> list:
+        """Run one statement on a pooled connection in autocommit mode: a single round trip"""
+        if not self._initialized:
+            await self.initialize()
+        async with self._autocommit_engine.connect() as conn:
+            result = await conn.execute(stmt)
+            return result.all() if result.returns_rows else []
     
     async def close(self):
+        if self._keyword_refresh_task:
+            self._keyword_refresh_task.cancel()
+            self._keyword_refresh_task = None
+        for task in self._notification_tasks:
+            task.cancel()
+        self._notification_tasks.clear()
+        if self._keyword_listener:
+            try:
+                await self._keyword_listener.close()
+            except Exception as e:
+                logger.warning(f"Error closing keyword listener: {e}")
+            self._keyword_listener = None
         if self.engine:
             await self.engine.dispose()
-    
-    async def add_keyword(self, keyword: str) -> bool:
+
+    @property
+    def keyword_snapshot(self) -> Tuple[str, ...]:
+        """Current excluded keywords, served from memory without touching the database"""
+        return self._keyword_snapshot
+
+    @property
+    def keyword_matcher(self) -> KeywordMatcher:
+        """Matcher compiled from the current snapshot, rebuilt only when the set changes"""
+        return self._keyword_matcher
+
+    def _set_keyword_snapshot(self, keywords) -> None:
+        snapshot = tuple(keywords)
+        if snapshot == self._keyword_snapshot:
+            return
+        self._keyword_matcher = KeywordMatcher(snapshot)
+        self._keyword_snapshot = snapshot
+        broadcaster.publish('keywords', {'count': len(snapshot)})
+
+    async def refresh_keywords(self) -> bool:
+        """Reload the keyword snapshot from the database"""
         try:
-            async with await self.get_session() as session:
-                new_keyword = ExcludedKeyword(keyword=keyword.strip())
-                session.add(new_keyword)
-                await session.commit()
-                logger.info(f"Added excluded keyword: {keyword}")
-                return True
+            rows = await self._execute(select(ExcludedKeyword.keyword).order_by(ExcludedKeyword.id))
+            self._set_keyword_snapshot(keyword for keyword, in rows)
+            logger.debug(f"Keyword snapshot refreshed: {len(self._keyword_snapshot)} keywords")
+            return True
         except Exception as e:
-            logger.error(f"Error adding keyword '{keyword}': {e}")
+            logger.error(f"Error refreshing keyword snapshot: {e}")
             return False
+
+    async def _start_keyword_listener(self):
+        """Subscribe to keyword change notifications sent by other instances"""
+        try:
+            self._keyword_listener = await asyncpg.connect(self._dsn())
+            await self._keyword_listener.add_listener(KEYWORDS_CHANNEL, self._on_keywords_notification)
+            logger.info(f"Listening for keyword changes on '{KEYWORDS_CHANNEL}'")
+        except Exception as e:
+            self._keyword_listener = None
+            logger.warning(f"Keyword change listener unavailable, relying on TTL refresh: {e}")
+
+    def _on_keywords_notification(self, connection, pid, channel, payload):
+        try:
+            origin = json.loads(payload).get('origin')
+        except (ValueError, AttributeError):
+            origin = None
+        # Our own changes are already applied write-through
+        if origin == self._instance_id:
+            return
+        task = asyncio.get_running_loop().create_task(self.refresh_keywords())
+        self._notification_tasks.add(task)
+        task.add_done_callback(self._notification_tasks.discard)
+
+    async def _refresh_keywords_periodically(self):
+        """TTL fallback in case a notification was missed or the listener connection dropped"""
+        while True:
+            await asyncio.sleep(Config.KEYWORDS_CACHE_TTL)
+            if self._keyword_listener is None or self._keyword_listener.is_closed():
+                await self._start_keyword_listener()
+            await self.refresh_keywords()
+
+    def _notify_keywords_changed(self, op: str, keyword: Optional[str]):
+        """pg_notify() call to select once per changed row, so nothing is sent when nothing changed"""
+        payload = json.dumps({'origin': self._instance_id, 'op': op, 'keyword': keyword})
+        return func.pg_notify(KEYWORDS_CHANNEL, payload)
+
+    async def add_keyword(self, keyword: str) -> Optional[bool]:
+        """Insert a keyword in one statement: True if created, False if it already existed, None on error"""
+        keyword = keyword.strip()
+        try:
+            inserted = (
+                insert(ExcludedKeyword)
+                .values(keyword=keyword, keyword_normalized=normalize(keyword), created_at=datetime.utcnow())
+                .on_conflict_do_nothing(index_elements=[ExcludedKeyword.keyword_normalized])
+                .returning(ExcludedKeyword.keyword)
+                .cte('inserted')
+            )
+            stmt = select(inserted.c.keyword, self._notify_keywords_changed('add', keyword)).select_from(inserted)
+            if not await self._execute(stmt):
+                logger.info(f"Excluded keyword already exists: {keyword}")
+                return False
+            if keyword not in self._keyword_snapshot:
+                self._set_keyword_snapshot(self._keyword_snapshot + (keyword,))
+            logger.info(f"Added excluded keyword: {keyword}")
+            return True
+        except Exception as e:
+            logger.error(f"Error adding keyword '{keyword}': {e}")
+            return None
     
+    async def add_keywords(self, keywords: List[str]) -> Optional[List[str]]:
+        """Insert many stripped keywords in one statement and transaction; returns the ones created, None on error"""
+        if not keywords:
+            return []
+        try:
+            values = func.unnest(
+                bindparam('keywords', keywords, type_=ARRAY(String)),
+                bindparam('normalized', [normalize(keyword) for keyword in keywords], type_=ARRAY(String)),
+            ).table_valued('keyword', 'keyword_normalized').render_derived()
+            rows = select(values.c.keyword, values.c.keyword_normalized, literal(datetime.utcnow(), DateTime))
+            inserted = (
+                insert(ExcludedKeyword)
+                .from_select(['keyword', 'keyword_normalized', 'created_at'], rows)
+                .on_conflict_do_nothing(index_elements=[ExcludedKeyword.keyword_normalized])
+                .returning(ExcludedKeyword.keyword)
+                .cte('inserted')
+            )
+            # Postgres folds identical notifications of one transaction, so this sends one per batch
+            stmt = select(inserted.c.keyword, self._notify_keywords_changed('import', None)).select_from(inserted)
+            created = [keyword for keyword, _ in await self._execute(stmt)]
+            if created:
+                # One snapshot, so the matcher is rebuilt once for the whole batch
+                self._set_keyword_snapshot(self._keyword_snapshot + tuple(created))
+            logger.info(f"Imported excluded keywords: {len(created)} added, {len(keywords) - len(created)} already present")
+            return created
+        except Exception as e:
+            logger.error(f"Error importing {len(keywords)} keywords: {e}")
+            return None
+
     async def remove_keyword(self, keyword: str) -> bool:
+        keyword = keyword.strip()
         try:
-            async with await self.get_session() as session:
-                stmt = delete(ExcludedKeyword).where(ExcludedKeyword.keyword == keyword.strip())
-                result = await session.execute(stmt)
-                await session.commit()
-                
-                if result.rowcount > 0:
-                    logger.info(f"Removed excluded keyword: {keyword}")
-                    return True
-                else:
-                    logger.warning(f"Keyword not found: {keyword}")
-                    return False
+            deleted = (
+                delete(ExcludedKeyword)
+                .where(ExcludedKeyword.keyword_normalized == normalize(keyword))
+                .returning(ExcludedKeyword.keyword)
+                .cte('deleted')
+            )
+            stmt = select(deleted.c.keyword, self._notify_keywords_changed('remove', keyword)).select_from(deleted)
+            if await self._execute(stmt):
+                self._set_keyword_snapshot(k for k in self._keyword_snapshot if normalize(k) != normalize(keyword))
+                logger.info(f"Removed excluded keyword: {keyword}")
+                return True
+            else:
+                logger.warning(f"Keyword not found: {keyword}")
+                return False
         except Exception as e:
             logger.error(f"Error removing keyword '{keyword}': {e}")
             return False
     
-    async def get_all_keywords(self) -> List[str]:
-        try:
-            async with await self.get_session() as session:
-                stmt = select(ExcludedKeyword.keyword).order_by(ExcludedKeyword.created_at)
-                result = await session.execute(stmt)
-                keywords = result.scalars().all()
-                return list(keywords)
-        except Exception as e:
-            logger.error(f"Error fetching keywords: {e}")
-            return []
+    async def search_keywords(self, prefix: str = '', after: str = '', limit: int = 100) -> Tuple[List[str], Optional[str]]:
+        """One page of keywords in normalized order, only those starting with prefix (case-insensitive) if given.
+
+        Returns the keywords and the cursor of the next page, None on the last
+        one. Both filters are ranges on the keyword_normalized index.
+        """
+        stmt = (
+            select(ExcludedKeyword.keyword, ExcludedKeyword.keyword_normalized)
+            .order_by(ExcludedKeyword.keyword_normalized)
+            .limit(limit + 1)
+        )
+        prefix = normalize(prefix)
+        if prefix:
+            stmt = stmt.where(ExcludedKeyword.keyword_normalized >= prefix)
+            end = _prefix_end(prefix)
+            if end is not None:
+                stmt = stmt.where(ExcludedKeyword.keyword_normalized < end)
+        if after:
+            stmt = stmt.where(ExcludedKeyword.keyword_normalized > after)
+        rows = await self._execute(stmt)
+        next_cursor = rows[limit - 1][1] if len(rows) > limit else None
+        return [keyword for keyword, _ in rows[:limit]], next_cursor
+    
+    async def iter_keywords(self, batch_size: int = 1000) -> AsyncIterator[List[str]]:
+        """All keywords in insertion order, in batches read through a server-side cursor"""
+        if not self._initialized:
+            await self.initialize()
+        async with self.engine.connect() as conn:
+            stmt = select(ExcludedKeyword.keyword).order_by(ExcludedKeyword.id)
+            result = await conn.stream(stmt.execution_options(yield_per=batch_size))
+            async for partition in result.partitions():
+                yield [keyword for keyword, in partition]
     
     async def keyword_exists(self, keyword: str) -> bool:
         try:
-            async with await self.get_session() as session:
-                stmt = select(ExcludedKeyword).where(ExcludedKeyword.keyword == keyword.strip())
-                result = await session.execute(stmt)
-                return result.first() is not None
+            stmt = select(ExcludedKeyword.id).where(ExcludedKeyword.keyword_normalized == normalize(keyword)).limit(1)
+            return bool(await self._execute(stmt))
         except Exception as e:
             logger.error(f"Error checking keyword existence '{keyword}': {e}")
             return False
 
 
+    async def get_chat_cursors(self, account: str) -> Dict[int, int]:
+        try:
+            stmt = select(ChatCursor.chat_id, ChatCursor.last_message_id).where(ChatCursor.account == account)
+            return {chat_id: message_id for chat_id, message_id in await self._execute(stmt)}
+        except Exception as e:
+            logger.error(f"Error fetching message cursors for '{account}': {e}")
+            return {}
+
+    async def save_chat_cursors(self, account: str, cursors: Dict[int, int]) -> bool:
+        """Upsert the cursors of one account; a stored cursor never moves backwards"""
+        if not cursors:
+            return True
+        try:
+            now = datetime.utcnow()
+            stmt = insert(ChatCursor).values([
+                {'account': account, 'chat_id': chat_id, 'last_message_id': message_id, 'updated_at': now}
+                for chat_id, message_id in cursors.items()
+            ])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[ChatCursor.account, ChatCursor.chat_id],
+                set_={
+                    'last_message_id': func.greatest(ChatCursor.last_message_id, stmt.excluded.last_message_id),
+                    'updated_at': stmt.excluded.updated_at,
+                },
+            )
+            await self._execute(stmt)
+            return True
+        except Exception as e:
+            logger.error(f"Error saving message cursors for '{account}': {e}")
+            return False
+
+
 # Global database manager instance
 db_manager = DatabaseManager()
\ No newline at end of file
@@ -0,0 +1,105 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+def fingerprint(text: str) -> int:
+    """Cheap content key: case and whitespace differences do not matter"""
+    return hash(' '.join(text.casefold().split()))
+
+
+class MessageDeduplicator:
+    """Recently handled messages of one account, so replays and cross-posts are not handled twice.
+
+    Messages are remembered by (chat_id, message_id) in a fixed-size LRU. Their
+    normalized text is remembered too, for text_ttl seconds, to catch the same
+    order posted again (usually to another source group) under a new id.
+    """
+
+    def __init__(self, max_size: int, text_ttl: float):
+        self._ids: "OrderedDict[Hashable, None]" = OrderedDict()
+        self._texts: "OrderedDict[int, Tuple[float, Hashable]]" = OrderedDict()
+        self._max_size = max_size
+        self._text_ttl = text_ttl
+        self.checked = 0
+        self.id_hits = 0
+        self.text_hits = 0
+
+    def seen_id(self, chat_id: int, message_id: int) -> bool:
+        """True if this message was handled before; otherwise remembers it"""
+        self.checked += 1
+        key = (chat_id, message_id)
+        if key in self._ids:
+            self._ids.move_to_end(key)
+            self.id_hits += 1
+            return True
+        self._ids[key] = None
+        if len(self._ids) > self._max_size:
+            self._ids.popitem(last=False)
+        return False
+
+    def seen_text(self, chat_id: int, message_id: int, text: str, now: Optional[float] = None) -> bool:
+        """True if another message with the same normalized text was handled within text_ttl"""
+        if not text:
+            return False
+        now = time.monotonic() if now is None else now
+        texts = self._texts
+        # Entries are in insertion order, so expired ones are at the front
+        while texts and now - next(iter(texts.values()))[0] > self._text_ttl:
+            texts.popitem(last=False)
+        key = fingerprint(text)
+        entry = texts.get(key)
+        if entry is not None and entry[1] != (chat_id, message_id):
+            self.text_hits += 1
+            return True
+        texts.pop(key, None)
+        texts[key] = (now, (chat_id, message_id))
+        if len(texts) > self._max_size:
+            texts.popitem(last=False)
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'checked': self.checked,
+            'id_hits': self.id_hits,
+            'text_hits': self.text_hits,
+            'size': len(self._ids),
+        }
+
+
+class RejectionCache:
+    """Rule that rejected each recent message, so an edit only needs to re-check from there.
+
+    Entries expire ttl seconds after the original rejection; at most max_size are kept.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self._entries: "OrderedDict[Hashable, Tuple[float, str]]" = OrderedDict()
+        self._max_size = max_size
+        self._ttl = ttl
+
+    def _expire(self, now: float):
+        entries = self._entries
+        while entries and now - next(iter(entries.values()))[0] > self._ttl:
+            entries.popitem(last=False)
+
+    def add(self, chat_id: int, message_id: int, rule: str, now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        self._expire(now)
+        key = (chat_id, message_id)
+        # Keep the original time and position, so repeated edits do not extend the window
+        rejected_at = self._entries.get(key, (now, rule))[0]
+        self._entries[key] = (rejected_at, rule)
+        if len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def get(self, chat_id: int, message_id: int, now: Optional[float] = None) -> Optional[str]:
+        self._expire(time.monotonic() if now is None else now)
+        entry = self._entries.get((chat_id, message_id))
+        return entry[1] if entry is not None else None
+
+    def discard(self, chat_id: int, message_id: int):
+        self._entries.pop((chat_id, message_id), None)
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,70 @@
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, Optional, Set
+
+# Events buffered per connected admin tab before new ones are dropped for it
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+
+class EventBroadcaster:
+    """Fan-out of server-sent events (status, log lines, keyword changes) to connected admin tabs"""
+
+    def __init__(self):
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def bind_loop(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+
+    def publish(self, event: str, data: Any):
+        """Queue an event for every subscriber; must be called on the event loop thread"""
+        if not self._subscribers:
+            return
+        payload = f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode()
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                pass
+
+    def publish_threadsafe(self, event: str, data: Any):
+        """Like publish(), but callable from any thread (e.g. logging handlers)"""
+        if not self._subscribers or self._loop is None or self._loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self.publish(event, data)
+        else:
+            self._loop.call_soon_threadsafe(self.publish, event, data)
+
+    @asynccontextmanager
+    async def subscribe(self):
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers.discard(queue)
+
+
+class BroadcastLogHandler(logging.Handler):
+    """Pushes formatted log records to the admin panel stream"""
+
+    def __init__(self, broadcaster: EventBroadcaster, level=logging.NOTSET):
+        super().__init__(level)
+        self.broadcaster = broadcaster
+
+    def emit(self, record):
+        try:
+            self.broadcaster.publish_threadsafe('log', self.format(record))
+        except Exception:
+            self.handleError(record)
+
+
+# Global broadcaster instance
+broadcaster = EventBroadcaster()
@@ -0,0 +1,334 @@
+"""In-process stand-in for Telegram, for load testing without network access.
+
+Enabled with FAKE_TELEGRAM=true: TelegramClientFactory.create_client then returns
+a FakeTelegramClient. All fake clients talk to one FakeTelegramServer, which
+posts synthetic order messages to every source chat a client listens on, and
+can inject latency, FloodWait errors, disconnects and an auth revocation. It
+records every click and forward.
+
+FakeTelegramClient subclasses TelegramClient and only replaces the network
+layer, so event builders, Message objects, buttons and click() are the real
+Telethon code paths.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import random
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from telethon import TelegramClient, events, utils as telethon_utils
+from telethon.crypto import AuthKey
+from telethon.errors import AuthKeyUnregisteredError, FloodWaitError, UnauthorizedError
+from telethon.sessions import StringSession
+from telethon.tl import functions, types
+from telethon.tl.patched import Message
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+TAKE_ORDER_BUTTON = "Забрать заказ"
+FILLER = "доставка мебели, подъём на 5 этаж, есть грузовой лифт, клиент просит позвонить за час. "
+# Messages kept per chat for iter_messages (gap backfill)
+HISTORY_SIZE = 1000
+
+
+def order_text(rng: random.Random, number: int, keywords=(), hit_rate: float = 0.0,
+               chatter_rate: float = 0.2) -> str:
+    """A synthetic source group post: an order with an amount, or plain chatter"""
+    description = FILLER * rng.randint(1, 20)
+    if rng.random() < chatter_rate:
+        text = f"Коллеги, {description}"
+    else:
+        text = (f"**Новый заказ**\nАдрес: ул. Ленина, д. {number}\nОписание: {description}"
+                f"**Сумма заказа:** {rng.randint(0, 50_000)}\n")
+    if keywords and rng.random() < hit_rate:
+        text += f"Комментарий: {rng.choice(keywords)}\n"
+    return text
+
+
+def order_markup(text: str = TAKE_ORDER_BUTTON):
+    button = types.KeyboardButton(text, types.InlineButtonTypeCallback(b'take'))
+    return types.ReplyInlineMarkup(rows=[types.KeyboardButtonRow([button])])
+
+
+def chat_entity(chat_id: int):
+    """Channel or basic group entity for a marked chat id"""
+    real_id, peer_type = telethon_utils.resolve_id(chat_id)
+    if peer_type is types.PeerChannel:
+        return types.Channel(id=real_id, title=f"Fake group {real_id}", photo=types.ChatPhotoEmpty(), date=None,
+                             megagroup=True, access_hash=0)
+    return types.Chat(id=real_id, title=f"Fake group {real_id}", photo=types.ChatPhotoEmpty(),
+                      participants_count=0, date=None, version=0)
+
+
+class FakeTelegramServer:
+    """Shared state behind all fake clients: chats, message history, failures and the click/forward log"""
+
+    def __init__(self):
+        self.rng = random.Random(Config.FAKE_TELEGRAM_SEED)
+        self.rate = Config.FAKE_TELEGRAM_RATE
+        self.latency = Config.FAKE_TELEGRAM_LATENCY_MS / 1000
+        self.flood_rate = Config.FAKE_TELEGRAM_FLOOD_RATE
+        self.disconnect_every = Config.FAKE_TELEGRAM_DISCONNECT_EVERY
+        self.revoke_after = Config.FAKE_TELEGRAM_REVOKE_AFTER
+        self.revoked = False
+        self.clients: List['FakeTelegramClient'] = []
+        self.history: Dict[int, List[Message]] = {}
+        self._next_id: Dict[int, int] = {}
+        self.clicks: List[Tuple[str, int, int, float]] = []
+        self.forwards: List[Tuple[str, Any, int, float]] = []
+        self.posted = 0
+        self._tasks: List[asyncio.Task] = []
+        # Update deliveries in flight, referenced so they are not garbage collected mid-run
+        self._deliveries: Set[asyncio.Task] = set()
+
+    def start(self):
+        if self._tasks:
+            return
+        self._started = time.monotonic()
+        self._tasks = [asyncio.create_task(self._post_periodically()), asyncio.create_task(self._inject_failures())]
+        logger.info(f"Fake Telegram started: {self.rate} msg/s, {self.latency * 1000:.0f} ms latency, "
+                    f"flood rate {self.flood_rate}, disconnect every {self.disconnect_every or '-'} s, "
+                    f"revoke after {self.revoke_after or '-'} s")
+
+    def stop(self):
+        for task in self._tasks + list(self._deliveries):
+            task.cancel()
+        self._tasks = []
+
+    async def rpc(self, client: 'FakeTelegramClient', request=None, flood: bool = False):
+        """Simulated round trip: connection and auth checks, latency, optional FloodWait"""
+        if not client.is_connected():
+            raise ConnectionError("Cannot send requests while disconnected")
+        await asyncio.sleep(self.latency * self.rng.uniform(0.5, 1.5))
+        if self.revoked:
+            raise AuthKeyUnregisteredError(request=request)
+        if flood and self.rng.random() < self.flood_rate:
+            raise FloodWaitError(request=request, capture=self.rng.randint(1, 30))
+
+    def listened_chats(self):
+        chats = set()
+        for client in self.clients:
+            for _, builder in client.list_event_handlers():
+                # Marked ids, before and after the builder resolves them
+                chats.update(chat for chat in builder.chats or () if isinstance(chat, int))
+        return chats
+
+    def post(self, chat_id: int, text: str, button: bool = True) -> Message:
+        """Publish a message to chat_id and deliver it to every connected client listening there"""
+        message_id = self._next_id.get(chat_id, 0) + 1
+        self._next_id[chat_id] = message_id
+        message = Message(id=message_id, peer_id=telethon_utils.get_peer(chat_id), date=datetime.now(timezone.utc),
+                          message=text, reply_markup=order_markup() if button else None)
+        history = self.history.setdefault(chat_id, [])
+        history.append(message)
+        del history[:-HISTORY_SIZE]
+        self.posted += 1
+        self._deliver(events.NewMessage, chat_id, message)
+        return message
+
+    def edit(self, chat_id: int, message_id: int, text: str, button: Optional[bool] = None) -> Optional[Message]:
+        for message in self.history.get(chat_id, []):
+            if message.id == message_id:
+                message.message = text
+                message.edit_date = datetime.now(timezone.utc)
+                if button is not None:
+                    message.reply_markup = order_markup() if button else None
+                self._deliver(events.MessageEdited, chat_id, message)
+                return message
+        return None
+
+    def _deliver(self, builder_type, chat_id: int, message: Message):
+        for client in self.clients:
+            if client.is_connected():
+                task = asyncio.create_task(client.dispatch(builder_type, chat_id, message))
+                self._deliveries.add(task)
+                task.add_done_callback(self._deliveries.discard)
+
+    async def _post_periodically(self):
+        while True:
+            await asyncio.sleep(self.rng.expovariate(self.rate) if self.rate > 0 else 1)
+            chats = self.listened_chats()
+            if self.rate > 0 and chats:
+                self.post(self.rng.choice(sorted(chats)), order_text(self.rng, self.posted + 1),
+                          self.rng.random() < 0.8)
+
+    async def _inject_failures(self):
+        next_drop = self.disconnect_every
+        while True:
+            await asyncio.sleep(1)
+            elapsed = time.monotonic() - self._started
+            if self.revoke_after and not self.revoked and elapsed >= self.revoke_after:
+                self.revoked = True
+                logger.warning("Fake Telegram: authorization revoked for all sessions")
+            if self.disconnect_every and elapsed >= next_drop:
+                next_drop += self.disconnect_every
+                connected = [client for client in self.clients if client.is_connected()]
+                if connected:
+                    logger.warning("Fake Telegram: dropping a client connection")
+                    self.rng.choice(connected).drop()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'posted': self.posted,
+            'clicks': len(self.clicks),
+            'forwards': len(self.forwards),
+            'connected_clients': sum(1 for client in self.clients if client.is_connected()),
+            'revoked': self.revoked,
+        }
+
+
+class FakeTelegramClient(TelegramClient):
+    """TelegramClient whose network layer is the in-process FakeTelegramServer"""
+
+    def __init__(self, session_str: Optional[str] = None, server: Optional[FakeTelegramServer] = None):
+        super().__init__(StringSession(session_str), Config.API_ID or 1, Config.API_HASH or 'fake')
+        self.server = server or fake_server
+        self._connected = False
+        self._disconnected_future: Optional[asyncio.Future] = None
+
+    # Connection
+
+    async def connect(self):
+        await asyncio.sleep(self.server.latency)
+        self._connected = True
+        self._disconnected_future = asyncio.get_running_loop().create_future()
+        if self not in self.server.clients:
+            self.server.clients.append(self)
+        self.server.start()
+
+    def is_connected(self):
+        return self._connected
+
+    @property
+    def disconnected(self):
+        if self._disconnected_future is None:
+            self._disconnected_future = asyncio.get_running_loop().create_future()
+        return asyncio.shield(self._disconnected_future)
+
+    def drop(self):
+        """Lose the connection as a network failure would"""
+        self._connected = False
+        if self._disconnected_future is not None and not self._disconnected_future.done():
+            self._disconnected_future.set_exception(ConnectionError("Connection to Telegram lost"))
+            # Nobody may be waiting; do not log "exception never retrieved"
+            self._disconnected_future.exception()
+
+    async def disconnect(self):
+        self._connected = False
+        if self._disconnected_future is not None and not self._disconnected_future.done():
+            self._disconnected_future.set_result(None)
+        if self in self.server.clients:
+            self.server.clients.remove(self)
+
+    # Login
+
+    async def send_code_request(self, phone, *, force_sms=False, _retry_count=0):
+        await self.server.rpc(self)
+        return types.auth.SentCode(type=types.auth.SentCodeTypeApp(length=5), phone_code_hash='fake')
+
+    async def sign_in(self, phone=None, code=None, *, password=None, bot_token=None, phone_code_hash=None):
+        await self.server.rpc(self)
+        self.session.set_dc(2, '127.0.0.1', 443)
+        self.session.auth_key = AuthKey(os.urandom(256))
+        return await self.get_me()
+
+    # Requests
+
+    async def get_me(self, input_peer=False):
+        try:
+            await self.server.rpc(self, functions.users.GetUsersRequest([types.InputUserSelf()]))
+        except UnauthorizedError:
+            # Like Telethon's get_me(): a revoked authorization is None, not an error
+            return None
+        if self.session.auth_key is None:
+            return None
+        return types.User(id=1, first_name='Fake', phone='0000000000', is_self=True, access_hash=0)
+
+    async def get_entity(self, entity):
+        await self.server.rpc(self)
+        if isinstance(entity, int) and entity < 0:
+            return chat_entity(entity)
+        return types.User(id=self._user_id(entity), first_name=str(entity), access_hash=0)
+
+    async def get_input_entity(self, peer):
+        if isinstance(peer, types.TypeInputPeer):
+            return peer
+        await self.server.rpc(self)
+        if isinstance(peer, int) and peer < 0:
+            return telethon_utils.get_input_peer(chat_entity(peer))
+        return types.InputPeerUser(self._user_id(peer), 0)
+
+    @staticmethod
+    def _user_id(entity) -> int:
+        if isinstance(entity, int):
+            return entity
+        return int.from_bytes(hashlib.sha1(str(entity).encode()).digest()[:4], 'big')
+
+    async def forward_messages(self, entity, messages, from_peer=None, **kwargs):
+        messages = messages if isinstance(messages, list) else [messages]
+        request = functions.messages.ForwardMessagesRequest(
+            from_peer=messages[0].input_chat, id=[message.id for message in messages], to_peer=entity)
+        await self.server.rpc(self, request, flood=True)
+        for message in messages:
+            self.server.forwards.append((self.label, entity, message.id, time.monotonic()))
+        return messages
+
+    async def iter_messages(self, entity, limit=None, *, min_id=0, max_id=0, **kwargs):
+        """Newest first, like Telethon; an async generator instead of a RequestIter"""
+        await self.server.rpc(self)
+        returned = 0
+        for message in reversed(self.server.history.get(entity, [])):
+            if message.id <= min_id or (max_id and message.id >= max_id):
+                continue
+            if limit is not None and returned >= limit:
+                return
+            returned += 1
+            yield self._copy(entity, message)
+
+    async def __call__(self, request, ordered=False, flood_sleep_threshold=None):
+        if isinstance(request, functions.messages.GetBotCallbackAnswerRequest):
+            await self.server.rpc(self, request, flood=True)
+            chat_id = telethon_utils.get_peer_id(request.peer)
+            self.server.clicks.append((self.label, chat_id, request.msg_id, time.monotonic()))
+            return types.messages.BotCallbackAnswer(cache_time=0, message="Заказ ваш")
+        raise NotImplementedError(f"Fake Telegram does not implement {type(request).__name__}")
+
+    # Updates
+
+    @property
+    def label(self) -> str:
+        return f"client-{id(self) & 0xffff:04x}"
+
+    def _copy(self, chat_id: int, message: Message) -> Message:
+        """A per-client Message, bound to this client like one received from Telegram"""
+        copy = Message(id=message.id, peer_id=message.peer_id, date=message.date, message=message.message,
+                       reply_markup=message.reply_markup, edit_date=message.edit_date)
+        copy._finish_init(self, {chat_id: chat_entity(chat_id)}, None)
+        return copy
+
+    async def dispatch(self, builder_type, chat_id: int, message: Message):
+        """Run the handlers registered for builder_type, as Telethon's update loop would"""
+        await asyncio.sleep(self.server.latency * self.server.rng.uniform(0.5, 1.5))
+        copy = self._copy(chat_id, message)
+        for callback, builder in self.list_event_handlers():
+            if type(builder) is not builder_type:
+                continue
+            if not builder.resolved:
+                await builder.resolve(self)
+            event = builder_type.Event(copy)
+            event._entities = {chat_id: chat_entity(chat_id)}
+            event._set_client(self)
+            if builder.filter(event):
+                try:
+                    await callback(event)
+                except Exception as e:
+                    logger.exception(f"Unhandled exception on {callback.__name__}: {e}")
+
+
+# Shared by every fake client of this process
+fake_server = FakeTelegramServer()
@@ -0,0 +1,55 @@
+import csv
+import io
+from typing import AsyncIterator, Iterable, List, Tuple
+
+from keyword_matcher import normalize
+
+# Length of ExcludedKeyword.keyword and keyword_normalized
+MAX_KEYWORD_LENGTH = 255
+CSV_HEADER = 'keyword'
+
+
+def parse_keyword_file(content: str, is_csv: bool) -> List[str]:
+    """Keywords of an uploaded file: the first column of a CSV (header optional), or one per line of text"""
+    if not is_csv:
+        return content.splitlines()
+    rows = [row[0] for row in csv.reader(io.StringIO(content)) if row]
+    if rows and rows[0].strip().lower() == CSV_HEADER:
+        rows = rows[1:]
+    return rows
+
+
+def fits_columns(keyword: str) -> bool:
+    """True if the keyword and its normalized form both fit in MAX_KEYWORD_LENGTH characters"""
+    # Casefolding can lengthen a keyword ("ß" -> "ss")
+    return len(keyword) <= MAX_KEYWORD_LENGTH and len(normalize(keyword)) <= MAX_KEYWORD_LENGTH
+
+
+def clean_keywords(raw: Iterable) -> Tuple[List[str], int]:
+    """Stripped keywords in input order, one per normalized form, and the number of entries that cannot be stored"""
+    keywords = {}
+    invalid = 0
+    for item in raw:
+        keyword = item.strip() if isinstance(item, str) else ''
+        if not keyword:
+            # Blank lines are not worth reporting; anything else that is not text is
+            invalid += not isinstance(item, str)
+            continue
+        if not fits_columns(keyword):
+            invalid += 1
+            continue
+        keywords.setdefault(normalize(keyword), keyword)
+    return list(keywords.values()), invalid
+
+
+async def export_lines(batches: AsyncIterator[List[str]], as_csv: bool) -> AsyncIterator[bytes]:
+    """Encode keyword batches as CSV (with header) or plain text, one chunk per batch"""
+    if as_csv:
+        yield (CSV_HEADER + '\r\n').encode()
+    async for batch in batches:
+        if as_csv:
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows([keyword] for keyword in batch)
+            yield buffer.getvalue().encode()
+        else:
+            yield ''.join(f"{keyword}\n" for keyword in batch).encode()
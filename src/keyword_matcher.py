@@ -0,0 +1,92 @@
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Below this size a plain substring scan over pre-normalized keywords is faster
+# than walking the automaton character by character in Python
+LINEAR_SCAN_LIMIT = 64
+
+
+def normalize(text: str) -> str:
+    return text.strip().casefold()
+
+
+class KeywordMatcher:
+    """Immutable multi-keyword matcher built once from a keyword set.
+
+    Large sets are compiled into an Aho-Corasick automaton so a message is
+    scanned in a single pass regardless of how many keywords there are.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        # Normalized keyword -> original keyword (first spelling wins)
+        self._originals: Dict[str, str] = {}
+        for keyword in keywords:
+            normalized = normalize(keyword)
+            if normalized and normalized not in self._originals:
+                self._originals[normalized] = keyword
+        self._patterns: Tuple[str, ...] = tuple(self._originals)
+
+        self._goto: List[Dict[str, int]] = []
+        self._fail: List[int] = []
+        self._output: List[Optional[str]] = []
+        if len(self._patterns) > LINEAR_SCAN_LIMIT:
+            self._build_automaton()
+
+    def __len__(self):
+        return len(self._patterns)
+
+    def _build_automaton(self):
+        goto = [{}]
+        output: List[Optional[str]] = [None]
+        for pattern in self._patterns:
+            state = 0
+            for char in pattern:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    output.append(None)
+                state = next_state
+            output[state] = pattern
+
+        # Breadth-first pass computing failure links; a state without its own
+        # keyword inherits the one ending on its failure chain
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = goto[fallback].get(char, 0)
+                if output[next_state] is None:
+                    output[next_state] = output[fail[next_state]]
+
+        self._goto = goto
+        self._fail = fail
+        self._output = output
+
+    def find(self, text: str) -> Optional[str]:
+        """Return the original spelling of the first keyword found in text, or None"""
+        if not self._patterns or not text:
+            return None
+        haystack = text.casefold()
+
+        if not self._goto:
+            for pattern in self._patterns:
+                if pattern in haystack:
+                    return self._originals[pattern]
+            return None
+
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for char in haystack:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state] is not None:
+                return self._originals[output[state]]
+        return None
@@ -0,0 +1,62 @@
+import os
+from typing import Any, Dict, Optional
+
+LOG_FILE = 'logs/app.log'
+# Upper bound for max_lines accepted from API clients
+MAX_TAIL_LINES = 1000
+CHUNK_SIZE = 64 * 1024
+
+
+def _parse_cursor(cursor: Optional[str]):
+    """Cursor format is '<inode>:<byte offset>'; anything else starts from the end of the file"""
+    try:
+        inode, offset = cursor.split(':', 1)
+        return int(inode), int(offset)
+    except (AttributeError, ValueError):
+        return None, None
+
+
+def read_tail(path: str = LOG_FILE, cursor: Optional[str] = None, max_lines: int = 200) -> Dict[str, Any]:
+    """Return complete lines written after cursor (at most the last max_lines of them) and the next cursor.
+
+    Blocking; call it through asyncio.to_thread from request handlers.
+    """
+    with open(path, 'rb') as f:
+        stat = os.fstat(f.fileno())
+        size = stat.st_size
+        inode, offset = _parse_cursor(cursor)
+        # A different inode or a shorter file means the log was rotated or truncated
+        if inode != stat.st_ino or offset is None or offset > size:
+            lower = 0
+        else:
+            lower = offset
+
+        # Read backwards from the end until max_lines complete lines are found or lower is reached
+        start = size
+        data = b''
+        while start > lower and data.count(b'\n') <= max_lines:
+            step = min(CHUNK_SIZE, start - lower)
+            start -= step
+            f.seek(start)
+            data = f.read(step) + data
+
+    truncated = False
+    last_newline = data.rfind(b'\n')
+    if last_newline == -1:
+        # No complete line yet; keep the cursor where the partial line starts
+        return {'lines': [], 'cursor': f"{stat.st_ino}:{start}", 'truncated': False}
+    next_cursor = start + last_newline + 1
+    lines = data[:last_newline].split(b'\n')
+
+    if start > lower:
+        # The first piece may be the tail of a line older than the window
+        lines = lines[1:]
+        truncated = True
+    if len(lines) > max_lines:
+        lines = lines[-max_lines:]
+        truncated = True
+    return {
+        'lines': [line.decode('utf-8', 'replace') for line in lines],
+        'cursor': f"{stat.st_ino}:{next_cursor}",
+        'truncated': truncated,
+    }
@@ -0,0 +1,116 @@
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import random
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict
+
+from config import Config
+from event_stream import broadcaster, BroadcastLogHandler
+from log_tail import LOG_FILE
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per line, for log shippers"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        # Records from StructuredQueueHandler carry the traceback already formatted
+        exc = record.exc_text or (self.formatException(record.exc_info) if record.exc_info else None)
+        if exc:
+            entry['exc'] = exc
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class StructuredQueueHandler(QueueHandler):
+    """QueueHandler that keeps the message and the traceback apart.
+
+    QueueHandler.prepare() folds the traceback into the message; here it goes to
+    exc_text instead, where the text formatter appends it and JsonLinesFormatter
+    puts it in its own field. exc_info is dropped so the record stays picklable.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = (self.formatter or logging.Formatter()).formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps only a fraction of records below WARNING from the configured loggers (and their children)"""
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        name = record.name
+        while name:
+            if name in self.rates:
+                return random.random() < self.rates[name]
+            name = name.rpartition('.')[0]
+        return True
+
+
+def parse_sampling(spec: str) -> Dict[str, float]:
+    """'utils=0.1,message_queue=0.5' -> {'utils': 0.1, 'message_queue': 0.5}"""
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        name, _, rate = item.partition('=')
+        rates[name.strip()] = float(rate)
+    return rates
+
+
+def configure_logging() -> QueueListener:
+    """Route all records through a queue so handlers doing I/O run on a background thread.
+
+    Only the QueueHandler runs on the event loop; console, rotating file and
+    admin panel stream handlers are driven by a QueueListener thread.
+    """
+    if not os.path.exists('logs'):
+        os.makedirs('logs')
+
+    text_formatter = logging.Formatter(TEXT_FORMAT)
+
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(text_formatter)
+
+    file_handler = RotatingFileHandler(LOG_FILE, maxBytes=Config.LOG_MAX_BYTES,
+                                       backupCount=Config.LOG_BACKUP_COUNT, encoding='utf-8')
+    file_handler.setFormatter(JsonLinesFormatter() if Config.LOG_FORMAT == 'json' else text_formatter)
+
+    stream_handler = BroadcastLogHandler(broadcaster, logging.INFO)
+    stream_handler.setFormatter(text_formatter)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = StructuredQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(parse_sampling(Config.LOG_SAMPLING)))
+
+    root = logging.getLogger()
+    root.setLevel(Config.LOG_LEVEL)
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+
+    listener = QueueListener(log_queue, console_handler, file_handler, stream_handler,
+                             respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
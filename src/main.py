@@ -3,7 +3,7 @@ from telethon.sessions import StringSession
 import asyncio
 import sys
 from config import Config
-from src.app import bot_manager
+from src.app import accounts
 import logging
 
 logger = logging.getLogger(__name__)
@@ -26,7 +26,7 @@ async def main():
     client = TelegramClient(StringSession(session_str), Config.API_ID, Config.API_HASH)
 
     # By default, app working immediately after start. But additionally user can enable/disable it from admin panel.
-    await bot_manager.toggle_monitoring()
+    await accounts.toggle_monitoring()
 
     async with client:
         logger.info("Bot started successfully!")
@@ -0,0 +1,193 @@
+import re
+import time
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from config import Config
+from database import db_manager
+from keyword_matcher import KeywordMatcher
+
+logger = logging.getLogger(__name__)
+
+AMOUNT_MARKER = "Сумма заказа"
+AMOUNT_PATTERN = re.compile(r"Сумма заказа:(?:\*\*)?\s*(\d+)")
+
+
+def parse_amount(text: str) -> Optional[int]:
+    """Extract the order amount, handling both plain and bold ('**Сумма заказа:**') markup"""
+    if AMOUNT_MARKER not in text:
+        return None
+    match = AMOUNT_PATTERN.search(text)
+    return int(match.group(1)) if match else None
+
+
+class Rule:
+    """A single compiled filter step; check() returns True when the message may pass"""
+
+    def __init__(self, name: str, cost: int, check: Callable[[Any, Dict[str, Any]], bool]):
+        self.name = name
+        self.cost = cost
+        self.check = check
+        self.calls = 0
+        self.rejections = 0
+        self.total_time = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'rule': self.name,
+            'calls': self.calls,
+            'rejections': self.rejections,
+            'avg_us': round(self.total_time / self.calls * 1e6, 2) if self.calls else 0.0,
+        }
+
+
+class FilterResult:
+    def __init__(self, passed: bool, rejected_by: Optional[str] = None, context: Optional[Dict[str, Any]] = None):
+        self.passed = passed
+        self.rejected_by = rejected_by
+        self.context = context or {}
+
+    def __bool__(self):
+        return self.passed
+
+
+def _message_text(message) -> str:
+    return message.text or ''
+
+
+def _amount_rules(spec):
+    minimum = spec.get('min')
+    maximum = spec.get('max')
+
+    def has_marker(message, context):
+        return AMOUNT_MARKER in _message_text(message)
+
+    def in_range(message, context):
+        amount = parse_amount(_message_text(message))
+        context['amount'] = amount
+        if amount is None:
+            return False
+        if minimum is not None and amount < minimum:
+            return False
+        if maximum is not None and amount > maximum:
+            return False
+        return True
+
+    return [Rule('amount_marker', 0, has_marker), Rule('amount_range', 2, in_range)]
+
+
+def _exclude_keywords_rules(spec):
+    # Without an explicit list, use the live snapshot kept by the database manager
+    static = KeywordMatcher(spec['keywords']) if 'keywords' in spec else None
+
+    def check(message, context):
+        matcher = static if static is not None else db_manager.keyword_matcher
+        keyword = matcher.find(_message_text(message))
+        if keyword is not None:
+            context['excluded_keyword'] = keyword
+            return False
+        return True
+
+    return [Rule('exclude_keywords', 4, check)]
+
+
+def _require_keywords_rules(spec):
+    matcher = KeywordMatcher(spec['keywords'])
+
+    def check(message, context):
+        return matcher.find(_message_text(message)) is not None
+
+    return [Rule('require_keywords', 3, check)]
+
+
+def _regex_rules(spec):
+    pattern = re.compile(spec['pattern'], re.IGNORECASE if spec.get('ignore_case') else 0)
+    exclude = spec.get('exclude', False)
+
+    def check(message, context):
+        found = pattern.search(_message_text(message)) is not None
+        return found != exclude
+
+    return [Rule(spec.get('name', 'regex'), 5, check)]
+
+
+def _sender_rules(spec):
+    allowed = frozenset(int(sender_id) for sender_id in spec['ids'])
+
+    def check(message, context):
+        return message.sender_id in allowed
+
+    return [Rule('sender', 1, check)]
+
+
+def _has_button_rules(spec):
+    text = spec.get('text')
+
+    def check(message, context):
+        # Read the raw markup instead of message.buttons to avoid building button wrappers
+        rows = getattr(message.reply_markup, 'rows', None)
+        if not rows:
+            return False
+        if text is None:
+            return True
+        return any(button.text == text for row in rows for button in row.buttons)
+
+    return [Rule('has_button', 1, check)]
+
+
+RULE_TYPES = {
+    'amount_range': _amount_rules,
+    'exclude_keywords': _exclude_keywords_rules,
+    'require_keywords': _require_keywords_rules,
+    'regex': _regex_rules,
+    'sender': _sender_rules,
+    'has_button': _has_button_rules,
+}
+
+
+def default_rules() -> List[Dict[str, Any]]:
+    """Rules equivalent to the original hardcoded check: amount above threshold and no excluded keyword"""
+    return [
+        {'type': 'amount_range', 'min': Config.ORDER_AMOUNT_THRESHOLD + 1},
+        {'type': 'exclude_keywords'},
+    ]
+
+
+class FilterPipeline:
+    """Chain of compiled rules, evaluated cheapest first and stopping at the first rejection"""
+
+    def __init__(self, rules: List[Rule]):
+        # Stable sort keeps the configured order between rules of equal cost
+        self.rules = sorted(rules, key=lambda rule: rule.cost)
+
+    def evaluate(self, message, first: Optional[str] = None) -> FilterResult:
+        """Run the rules; `first` names a rule to try before the others (the one that rejected an edited message)"""
+        context: Dict[str, Any] = {}
+        rules = self.rules
+        if first is not None:
+            rules = sorted(rules, key=lambda rule: rule.name != first)
+        for rule in rules:
+            started = time.perf_counter()
+            passed = rule.check(message, context)
+            rule.total_time += time.perf_counter() - started
+            rule.calls += 1
+            if not passed:
+                rule.rejections += 1
+                return FilterResult(False, rule.name, context)
+        return FilterResult(True, None, context)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [rule.stats() for rule in self.rules]
+
+
+def build_pipeline(specs: Optional[List[Dict[str, Any]]] = None) -> FilterPipeline:
+    """Compile rule declarations (see FILTER_RULES in .env.example) into a pipeline"""
+    rules: List[Rule] = []
+    for spec in specs or default_rules():
+        builder = RULE_TYPES.get(spec.get('type'))
+        if builder is None:
+            raise ValueError(f"Unknown filter rule type: {spec.get('type')}")
+        rules.extend(builder(spec))
+    pipeline = FilterPipeline(rules)
+    logger.info(f"Filter pipeline: {' -> '.join(rule.name for rule in pipeline.rules)}")
+    return pipeline
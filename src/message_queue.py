@@ -0,0 +1,170 @@
+import asyncio
+import heapq
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from message_filters import parse_amount
+from metrics import metrics, OrderTrace
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry:
+    __slots__ = ('priority', 'seq', 'enqueued_at', 'event', 'route', 'trace', 'removed')
+
+    def __init__(self, amount: Optional[int], seq: int, event, route, trace: OrderTrace):
+        # Higher amounts first; messages without an amount go after every order
+        self.priority = -amount if amount is not None else 1
+        self.seq = seq
+        self.enqueued_at = time.monotonic()
+        self.event = event
+        self.route = route
+        self.trace = trace
+        self.removed = False
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class MessageQueue:
+    """Bounded priority queue between the Telethon event handler and a fixed pool of workers.
+
+    Messages are served by order amount, highest first, parsed cheaply at receive
+    time. A message that has waited longer than the age cap is served next
+    regardless of amount, so small orders are not starved during a burst. When
+    the queue is full the lowest-priority message is dropped.
+    """
+
+    def __init__(self, handler: Callable[[Any, Any, OrderTrace], Awaitable[None]], maxsize: int, workers: int,
+                 age_cap_ms: int):
+        self._handler = handler
+        self._maxsize = maxsize
+        self._age_cap = age_cap_ms / 1000
+        self._heap: List[_Entry] = []
+        self._arrivals: Deque[_Entry] = deque()
+        self._size = 0
+        self._seq = 0
+        self._not_empty = asyncio.Event()
+        self._worker_count = workers
+        self._workers: List[asyncio.Task] = []
+        self.enqueued = 0
+        self.dropped = 0
+        self.processed = 0
+        self.aged = 0
+
+    def start(self):
+        if self._workers:
+            return
+        self._workers = [asyncio.create_task(self._worker(i)) for i in range(self._worker_count)]
+        logger.info(f"Message queue started: {self._worker_count} workers, max depth {self._maxsize}")
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._clear()
+        logger.info("Message queue stopped")
+
+    def _clear(self):
+        self._heap.clear()
+        self._arrivals.clear()
+        self._size = 0
+        self._not_empty.clear()
+
+    def submit(self, event, route, delivery_stage: str = 'delivery') -> None:
+        """Called from the event handler; never blocks"""
+        trace = OrderTrace(event.message, metrics, delivery_stage)
+        self._seq += 1
+        entry = _Entry(parse_amount(event.message.text or ''), self._seq, event, route, trace)
+
+        if self._size >= self._maxsize:
+            lowest = max((queued for queued in self._heap if not queued.removed), default=None)
+            if lowest is None or lowest < entry:
+                self.dropped += 1
+                logger.warning(f"Message queue full ({self._maxsize}), dropped incoming message")
+                return
+            lowest.removed = True
+            self._size -= 1
+            self.dropped += 1
+            logger.warning(f"Message queue full ({self._maxsize}), dropped lowest priority message")
+
+        heapq.heappush(self._heap, entry)
+        self._arrivals.append(entry)
+        self._size += 1
+        if len(self._heap) > 2 * self._maxsize:
+            self._compact()
+        self.enqueued += 1
+        self._not_empty.set()
+
+    def replace(self, chat_id: int, message) -> bool:
+        """Give a still queued message its edited version; False if it is not queued.
+
+        The entry keeps its place in arrival order and its trace, and is prioritized
+        by the edited amount. Called from the event handler; never blocks.
+        """
+        queued = next((entry for entry in self._heap if not entry.removed
+                       and entry.event.message.id == message.id and entry.event.chat_id == chat_id), None)
+        if queued is None:
+            return False
+        queued.event.message = message
+        entry = _Entry(parse_amount(message.text or ''), queued.seq, queued.event, queued.route, queued.trace)
+        entry.enqueued_at = queued.enqueued_at
+        queued.removed = True
+        heapq.heappush(self._heap, entry)
+        self._arrivals[self._arrivals.index(queued)] = entry
+        if len(self._heap) > 2 * self._maxsize:
+            self._compact()
+        return True
+
+    def _compact(self):
+        """Forget dropped and served entries that are still referenced lazily"""
+        self._heap = [queued for queued in self._heap if not queued.removed]
+        heapq.heapify(self._heap)
+        self._arrivals = deque(queued for queued in self._arrivals if not queued.removed)
+
+    def _pop(self) -> _Entry:
+        arrivals = self._arrivals
+        while arrivals[0].removed:
+            arrivals.popleft()
+        if time.monotonic() - arrivals[0].enqueued_at >= self._age_cap:
+            entry = arrivals.popleft()
+            self.aged += 1
+        else:
+            entry = heapq.heappop(self._heap)
+            while entry.removed:
+                entry = heapq.heappop(self._heap)
+        entry.removed = True
+        self._size -= 1
+        if self._size == 0:
+            # Drop lazily removed leftovers
+            self._clear()
+        return entry
+
+    async def _worker(self, number: int):
+        while True:
+            await self._not_empty.wait()
+            if self._size == 0:
+                self._not_empty.clear()
+                continue
+            entry = self._pop()
+            try:
+                entry.trace.mark('queue_wait')
+                await self._handler(entry.event, entry.route, entry.trace)
+            except Exception as e:
+                logger.error(f"Worker {number} failed to handle message: {e}")
+            finally:
+                self.processed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'depth': self._size,
+            'max_depth': self._maxsize,
+            'workers': len(self._workers),
+            'enqueued': self.enqueued,
+            'dropped': self.dropped,
+            'processed': self.processed,
+            'served_by_age': self.aged,
+        }
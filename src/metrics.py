@@ -0,0 +1,101 @@
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+# Rolling windows reported by /api/metrics, in seconds
+WINDOWS = {'1m': 60, '5m': 300, '1h': 3600}
+# Samples kept per stage; older samples fall out even if still inside a window
+MAX_SAMPLES = 10000
+
+# Order of stages as they happen for a matched message
+STAGES = ('delivery', 'backfill_delivery', 'queue_wait', 'filter_decided', 'click_sent', 'click_acked', 'forward_done')
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted, non-empty sequence"""
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class LatencyHistogram:
+    """Latency samples (ms) of one stage, summarized over rolling windows"""
+
+    def __init__(self, max_samples: int = MAX_SAMPLES):
+        self._samples: Deque[Tuple[float, float]] = deque(maxlen=max_samples)
+        self.total = 0
+
+    def record(self, value_ms: float, now: Optional[float] = None):
+        self._samples.append((time.monotonic() if now is None else now, value_ms))
+        self.total += 1
+
+    def summary(self, now: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        now = time.monotonic() if now is None else now
+        result = {}
+        for name, seconds in WINDOWS.items():
+            values = sorted(value for at, value in self._samples if now - at <= seconds)
+            if not values:
+                result[name] = {'count': 0}
+                continue
+            result[name] = {
+                'count': len(values),
+                'p50': round(percentile(values, 0.50), 2),
+                'p90': round(percentile(values, 0.90), 2),
+                'p99': round(percentile(values, 0.99), 2),
+                'max': round(values[-1], 2),
+            }
+        return result
+
+
+class LatencyMetrics:
+    """Per-stage histograms shared by all message handlers"""
+
+    def __init__(self):
+        self._histograms: Dict[str, LatencyHistogram] = {}
+
+    def record(self, stage: str, value_ms: float):
+        histogram = self._histograms.get(stage)
+        if histogram is None:
+            histogram = self._histograms[stage] = LatencyHistogram()
+        histogram.record(value_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        ordered = [stage for stage in STAGES if stage in self._histograms]
+        ordered += sorted(stage for stage in self._histograms if stage not in STAGES)
+        return {
+            stage: {'total': self._histograms[stage].total, **self._histograms[stage].summary(now)}
+            for stage in ordered
+        }
+
+
+class OrderTrace:
+    """Timestamps of one message as it moves through the handler.
+
+    'delivery' is the time from the Telegram message (or edit) date (whole seconds) to
+    receipt; messages fetched by backfill record it as 'backfill_delivery' instead, so
+    they do not skew live delivery. Every other stage is measured in ms from receipt.
+    """
+
+    def __init__(self, message, registry: LatencyMetrics, delivery_stage: str = 'delivery'):
+        self.registry = registry
+        self.received = time.perf_counter()
+        # An edited message is delivered again when it is edited
+        date = getattr(message, 'edit_date', None) or getattr(message, 'date', None)
+        if date is not None:
+            registry.record(delivery_stage, max(0.0, (time.time() - date.timestamp()) * 1000))
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.received) * 1000
+
+    def mark(self, stage: str, account: Optional[str] = None) -> float:
+        """Record a stage; with an account name it is also recorded as '<stage>:<account>'"""
+        elapsed = self.elapsed_ms()
+        self.registry.record(stage, elapsed)
+        if account is not None:
+            self.registry.record(f"{stage}:{account}", elapsed)
+        return elapsed
+
+
+# Global latency metrics instance
+metrics = LatencyMetrics()
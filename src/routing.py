@@ -0,0 +1,64 @@
+import logging
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from config import Config
+from message_filters import FilterPipeline, build_pipeline
+
+logger = logging.getLogger(__name__)
+
+# A forward target as configured: alternatives tried in order until one resolves
+TargetCandidates = Tuple[Union[str, int], ...]
+
+
+class Route:
+    """One source chat with its own filter pipeline and forward targets"""
+
+    def __init__(self, chat_id: int, pipeline: FilterPipeline, targets: List[TargetCandidates]):
+        self.chat_id = chat_id
+        self.pipeline = pipeline
+        self.targets = targets
+        # InputPeers resolved by BotManager, one per target (None until resolved)
+        self.target_entities: List[Optional[Any]] = [None] * len(targets)
+
+
+def _target_candidates(spec) -> TargetCandidates:
+    if isinstance(spec, dict):
+        candidates = (spec.get('username'), spec.get('id'))
+    else:
+        candidates = (spec,)
+    return tuple(candidate for candidate in candidates if candidate)
+
+
+def default_route_specs() -> List[Dict[str, Any]]:
+    """The single route described by SOURCE_GROUP_ID, FILTER_RULES and TARGET_USER_*"""
+    return [{
+        'chat_id': Config.SOURCE_GROUP_ID,
+        'rules': Config.FILTER_RULES,
+        'targets': [{'username': Config.TARGET_USER_NICKNAME, 'id': Config.TARGET_USER_ID}],
+    }]
+
+
+def build_route(spec: Dict[str, Any]) -> Route:
+    if not spec.get('chat_id'):
+        raise ValueError("Route has no chat_id; set SOURCE_GROUP_ID or ROUTES")
+    rules = spec.get('rules')
+    if not rules:
+        threshold = spec.get('threshold', Config.ORDER_AMOUNT_THRESHOLD)
+        rules = [{'type': 'amount_range', 'min': threshold + 1}]
+        exclusion = {'type': 'exclude_keywords'}
+        # Without an explicit list the route uses the shared keywords from the database
+        if 'exclude_keywords' in spec:
+            exclusion['keywords'] = spec['exclude_keywords']
+        rules.append(exclusion)
+    targets = [_target_candidates(target) for target in spec.get('targets', [])]
+    targets = [target for target in targets if target]
+    if not targets:
+        raise ValueError(f"Route for chat {spec.get('chat_id')} has no forward targets")
+    return Route(int(spec['chat_id']), build_pipeline(rules), targets)
+
+
+def build_routes(specs: Optional[List[Dict[str, Any]]] = None) -> List[Route]:
+    """Compile the routing table (see ROUTES in .env.example)"""
+    routes = [build_route(spec) for spec in (specs or default_route_specs())]
+    logger.info(f"Routing {len(routes)} source chat(s): {', '.join(str(route.chat_id) for route in routes)}")
+    return routes
@@ -2,11 +2,18 @@ import os
 
 class SessionManager:
     @staticmethod
-    def load_session(session_type='user'):
+    def _file_path(session_type='user', name=None):
+        # The primary user account keeps the original sessions/session.txt
+        if session_type == 'bot':
+            return 'sessions/session_bot.txt'
+        return f'sessions/session{"_" + name if name else ""}.txt'
+
+    @staticmethod
+    def load_session(session_type='user', name=None):
         if not os.path.exists('sessions'):
             os.makedirs('sessions')
         
-        file_path = f'sessions/session{"_bot" if session_type == "bot" else ""}.txt'
+        file_path = SessionManager._file_path(session_type, name)
         try:
             with open(file_path, 'r') as f:
                 return f.read().strip() or None
@@ -14,11 +21,11 @@ class SessionManager:
             return None
     
     @staticmethod
-    def save_session(session_str, session_type='user'):
+    def save_session(session_str, session_type='user', name=None):
         if not os.path.exists('sessions'):
             os.makedirs('sessions')
         
-        file_path = f'sessions/session{"_bot" if session_type == "bot" else ""}.txt'
+        file_path = SessionManager._file_path(session_type, name)
         try:
             with open(file_path, 'w') as f:
                 f.write(session_str)
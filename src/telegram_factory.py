@@ -1,26 +1,76 @@
+import asyncio
+import weakref
 from telethon import TelegramClient
+from telethon.errors import UnauthorizedError, AuthKeyDuplicatedError
 from telethon.sessions import StringSession
 from config import Config
 
+# RPC errors meaning the session can no longer act on behalf of the user
+AUTH_ERRORS = (UnauthorizedError, AuthKeyDuplicatedError)
+
+# Per client: last get_me() outcome as (fetched_at, user, error), and the request in flight.
+# Only users and AUTH_ERRORS are kept; any other error is transient and the next call retries.
+_me_results = weakref.WeakKeyDictionary()
+_me_pending = weakref.WeakKeyDictionary()
+
+
+async def _fetch_me(client):
+    try:
+        user, error = await client.get_me(), None
+    except Exception as e:
+        # Raised again from get_me(); its traceback would keep the frames of this request alive
+        user, error = None, e.with_traceback(None)
+    if error is None or isinstance(error, AUTH_ERRORS):
+        _me_results[client] = (asyncio.get_running_loop().time(), user, error)
+    _me_pending.pop(client, None)
+    return user, error
+
+
 class TelegramClientFactory:
     @staticmethod
     async def create_client(session_str=None):
-        session = StringSession(session_str) if session_str else StringSession()
-        client = TelegramClient(session, Config.API_ID, Config.API_HASH)
+        if Config.FAKE_TELEGRAM:
+            # In-process Telegram for load tests (see fake_telegram.py)
+            from fake_telegram import FakeTelegramClient
+            client = FakeTelegramClient(session_str)
+        else:
+            session = StringSession(session_str) if session_str else StringSession()
+            client = TelegramClient(session, Config.API_ID, Config.API_HASH)
         await client.connect()
         return client
+
+    @staticmethod
+    async def get_me(client, max_age=None):
+        """client.get_me() reused for max_age seconds (ME_CACHE_TTL by default), AUTH_ERRORS included.
+
+        Concurrent callers share one request; pass max_age=0 to skip the cached result.
+        """
+        max_age = Config.ME_CACHE_TTL if max_age is None else max_age
+        cached = _me_results.get(client)
+        if cached is not None and asyncio.get_running_loop().time() - cached[0] < max_age:
+            user, error = cached[1:]
+        else:
+            pending = _me_pending.get(client)
+            if pending is None:
+                pending = _me_pending[client] = asyncio.ensure_future(_fetch_me(client))
+            # A cancelled caller must not cancel the request others are waiting on
+            user, error = await asyncio.shield(pending)
+        if error is not None:
+            # The same instance is raised to every caller; drop the frames the previous raise attached
+            raise error.with_traceback(None)
+        return user
     
     @staticmethod
     async def check_authorization(client):
         try:
-            return await client.get_me() is not None
+            return await TelegramClientFactory.get_me(client) is not None
         except:
             return False
     
     @staticmethod
     async def get_user_info(client):
         try:
-            me = await client.get_me()
+            me = await TelegramClientFactory.get_me(client)
             return {'first_name': me.first_name} if me else None
         except:
             return None
@@ -28,7 +78,7 @@ class TelegramClientFactory:
     @staticmethod
     async def diagnose_session_error(client):
         try:
-            me = await client.get_me()
+            me = await TelegramClientFactory.get_me(client)
             return "Unable to get user info" if me is None else f"Security reset for {me.phone}"
         except Exception as e:
             error_str = str(e)
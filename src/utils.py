@@ -1,71 +1,156 @@
 import asyncio
+import time
 
+from telethon.errors import PeerIdInvalidError, UserIdInvalidError, InputUserDeactivatedError
 from config import Config
-from telegram_factory import TelegramClientFactory
-import re
+from telegram_factory import AUTH_ERRORS
+from metrics import metrics, OrderTrace
 import logging
 
 logger = logging.getLogger(__name__)
 
-async def handle_message(client, event, condition_func):
-    logger.info("Checking conditions")
-    if await condition_func(event.message):
+TAKE_ORDER_BUTTON = "Забрать заказ"
+
+# Errors suggesting the cached forward target is stale and should be resolved again
+STALE_TARGET_ERRORS = (ValueError, TypeError, PeerIdInvalidError, UserIdInvalidError, InputUserDeactivatedError)
+
+async def forward_to_target(bot, route, index, message):
+    """Forward using the pre-resolved target, re-resolving it only if the cached peer fails"""
+    try:
+        peer = route.target_entities[index]
+        if peer is None:
+            raise ValueError("Forward target is not resolved")
+        await bot.client.forward_messages(peer, message)
+    except STALE_TARGET_ERRORS as e:
+        logger.warning(f"Forward to cached target failed ({e}), resolving target again")
+        peer = await bot.resolve_target(route, index)
+        if peer is None:
+            raise
+        await bot.client.forward_messages(peer, message)
+
+async def forward_to_targets(bot, route, message):
+    await asyncio.gather(*(forward_to_target(bot, route, index, message) for index in range(len(route.targets))))
+
+async def timed(label, coro):
+    """Await coro and log its outcome together with how long it took"""
+    started = time.perf_counter()
+    try:
+        result = await coro
+    except Exception as e:
+        logger.error(f"{label} failed after {(time.perf_counter() - started) * 1000:.1f} ms: {e}")
+        raise
+    logger.info(f"{label} succeeded in {(time.perf_counter() - started) * 1000:.1f} ms")
+    return result
+
+async def click_take_order(bot, message, trace):
+    trace.mark('click_sent')
+    answer = await message.click(text=TAKE_ORDER_BUTTON)
+    trace.mark('click_acked', bot.name)
+    return answer
+
+def order_key(event):
+    """Identify an order across accounts: supergroup message ids are shared, basic group ids are per account"""
+    if event.is_channel:
+        return (event.chat_id, event.message.id)
+    return (event.chat_id, event.message.date, event.message.text)
+
+def won_race(bot, event, click_task):
+    """With several accounts, only the first one whose click succeeded forwards the order"""
+    if click_task is not None and (click_task.cancelled() or click_task.exception() is not None):
+        logger.info(f"Account '{bot.name}' could not click, leaving the order to other accounts")
+        return False
+    key = order_key(event)
+    if bot.claims.claim(key, bot.name):
+        logger.info(f"Account '{bot.name}' won order {key[:2]}")
+        return True
+    logger.info(f"Order {key[:2]} already taken by account '{bot.claims.owner(key)}', skipping forward")
+    return False
+
+async def forward_and_trace(bot, route, message, trace):
+    await forward_to_targets(bot, route, message)
+    trace.mark('forward_done')
+
+async def handle_message(bot, route, event, trace=None):
+    """Filter a source group message and, if it matches, take the order and forward it.
+
+    `bot` is the BotManager owning the client; its cached authorization state is
+    checked instead of calling Telegram on the latency-critical path. `route`
+    supplies the filter pipeline and forward targets of the message's chat.
+    """
+    message = event.message
+    # Replays after reconnects and backfill overlapping live events; nothing has been sent yet
+    if bot.dedup.seen_id(event.chat_id, message.id):
+        logger.info(f"Skipping message {message.id} in chat {event.chat_id}: already handled")
+        return
+    trace = trace or OrderTrace(message, metrics)
+    logger.info("Checking message: " + (message.text or ''))
+    result = route.pipeline.evaluate(message)
+    trace.mark('filter_decided')
+    await apply_filter_result(bot, route, event, result, trace)
+
+async def handle_edit(bot, route, event, trace=None):
+    """Re-check an edited message that was recently rejected, starting with the rule that rejected it.
+
+    Messages that passed were clicked already and are not in the rejection cache,
+    so their edits are ignored.
+    """
+    message = event.message
+    rule = bot.rejections.get(event.chat_id, message.id)
+    if rule is None:
+        return
+    trace = trace or OrderTrace(message, metrics)
+    logger.info(f"Re-checking edited message rejected by '{rule}': " + (message.text or ''))
+    result = route.pipeline.evaluate(message, first=rule)
+    trace.mark('filter_decided')
+    await apply_filter_result(bot, route, event, result, trace)
+
+async def apply_filter_result(bot, route, event, result, trace):
+    """Remember why a message was rejected, or take the order and forward it"""
+    message = event.message
+    if not result:
+        bot.rejections.add(event.chat_id, message.id, result.rejected_by)
+        logger.info(f"Message rejected by rule '{result.rejected_by}'")
+        if 'excluded_keyword' in result.context:
+            logger.warning(f"Message contains excluded keyword: {result.context['excluded_keyword']}")
+    else:
         try:
-            # Check if client is authorized before processing using factory method
-            if not await TelegramClientFactory.check_authorization(client):
+            # Local flag maintained by the connection monitor, no RPC here
+            if not bot.is_authorized():
                 logger.error("Cannot process message - client not authorized")
                 return
+            # Only orders actually taken are remembered, so cross-posts of a dropped one still get through
+            if bot.dedup.seen_text(event.chat_id, message.id, message.text):
+                logger.info("Skipping message: the same order was handled moments ago")
+                return
+            bot.rejections.discard(event.chat_id, message.id)
             
-            # First, check if the message has a button and click it
-            if event.message.buttons:
-                logger.info("Found buttons in message, preparing to click 'Забрать заказ'")
-                try:
-                    # Random delay before clicking
-                    #delay = random.uniform(0.0, 0.1)
-                    #logger.info(f"Waiting {delay:.2f} seconds before clicking...")
-                    #await asyncio.sleep(delay)
-
-                    await event.message.click(text="Забрать заказ")
-                    logger.info("Successfully clicked button")
-                    # Add a small delay to ensure the button click is processed
-                    await asyncio.sleep(1)
-                except Exception as e:
-                    logger.error(f"Error clicking button: {str(e)}")
+            # Send the click first; the forward goes out concurrently or once the click is answered
+            click_task = None
+            if message.buttons:
+                logger.info(f"Found buttons in message, clicking '{TAKE_ORDER_BUTTON}'")
+                click_task = asyncio.create_task(
+                    timed(f"Click on '{TAKE_ORDER_BUTTON}'", click_take_order(bot, message, trace)))
             else:
                 logger.info("No buttons found in message")
 
-            # Then proceed with forwarding
-            logger.info("Starting message forwarding")
-            target_entity = await client.get_input_entity(Config.TARGET_USER_NICKNAME)
-            await client.forward_messages(target_entity, event.message)
-            logger.info("Message forwarded successfully!")
+            # Racing accounts must know who clicked first before anyone forwards
+            racing = bot.is_racing()
+            if click_task is not None and (racing or Config.FORWARD_MODE == 'after_click'):
+                await asyncio.wait([click_task])
+            forward_task = None
+            if not racing or won_race(bot, event, click_task):
+                forward_task = asyncio.create_task(timed("Forward", forward_and_trace(bot, route, message, trace)))
 
+            outcomes = await asyncio.gather(*(task for task in (click_task, forward_task) if task),
+                                            return_exceptions=True)
+            for outcome in outcomes:
+                if isinstance(outcome, AUTH_ERRORS):
+                    raise outcome
+
+        except AUTH_ERRORS as e:
+            bot.mark_unauthorized(f"{type(e).__name__} while handling message")
+            logger.error(f"Error in message handling: {str(e)}")
         except Exception as e:
             logger.error(f"Error in message handling: {str(e)}")
 
     logger.info("Message processing completed.")
-
-async def text_contains_test(message):
-    logger.info("Checking message: " + message.text)
-    logger.info(f"DEBUG: Message length is {len(message.text)} characters.")
-
-    # Check if the message contains excluded keywords
-    excluded_keywords = await Config.get_excluded_keywords()
-    for keyword in excluded_keywords:
-        if keyword.strip() and keyword.strip().lower() in message.text.lower():
-            logger.warning(f"Message contains excluded keyword: {keyword}")
-            return False
-
-    # Check the summ of order
-    match1 = re.search(r"\*\*Сумма заказа:\*\*\s*(\d+)", message.text)
-    match2 = re.search(r"Сумма заказа:\s*(\d+)", message.text)
-
-    if match1:
-        order_amount = int(match1.group(1))
-        return order_amount > Config.ORDER_AMOUNT_THRESHOLD
-    if match2:
-        order_amount = int(match2.group(1))
-        return order_amount > Config.ORDER_AMOUNT_THRESHOLD
-    else:
-        logger.info("Message does not contain order amount")
-        return False
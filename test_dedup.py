@@ -0,0 +1,179 @@
+import sys
+
+# Add src directory to path
+sys.path.append('./src')
+
+from dedup import MessageDeduplicator, RejectionCache
+
+CHAT_ID = -1001
+OTHER_CHAT_ID = -1002
+
+
+class TestMessageDeduplicator:
+    """MessageDeduplicator id LRU and text window, with explicit clock values"""
+
+    def test_seen_id(self):
+        """A message id is a hit the second time, in its own chat only"""
+        dedup = MessageDeduplicator(10, 60)
+        assert not dedup.seen_id(CHAT_ID, 1)
+        assert dedup.seen_id(CHAT_ID, 1)
+        assert not dedup.seen_id(OTHER_CHAT_ID, 1)
+        assert not dedup.seen_id(CHAT_ID, 2)
+        print("✓ seen_id() reports repeated (chat, message) pairs")
+
+    def test_seen_id_lru(self):
+        """The least recently seen id is forgotten first; a hit refreshes an id"""
+        dedup = MessageDeduplicator(3, 60)
+        for message_id in (1, 2, 3):
+            dedup.seen_id(CHAT_ID, message_id)
+        assert dedup.seen_id(CHAT_ID, 1)
+        dedup.seen_id(CHAT_ID, 4)  # evicts 2, the least recently seen
+        assert dedup.stats()['size'] == 3
+        assert dedup.seen_id(CHAT_ID, 1)
+        assert dedup.seen_id(CHAT_ID, 3)
+        assert dedup.seen_id(CHAT_ID, 4)
+        assert not dedup.seen_id(CHAT_ID, 2)
+        print("✓ seen_id() keeps the most recently seen ids")
+
+    def test_seen_text_window(self):
+        """The same text under another id is a hit within text_ttl, and no longer after it"""
+        dedup = MessageDeduplicator(10, 60)
+        assert not dedup.seen_text(CHAT_ID, 1, "Заказ\n**Сумма заказа:** 5000", now=100)
+        # Case and whitespace differences do not matter, nor does the chat
+        assert dedup.seen_text(OTHER_CHAT_ID, 7, "  заказ **сумма заказа:**   5000 ", now=159)
+        assert not dedup.seen_text(CHAT_ID, 2, "Заказ **Сумма заказа:** 6000", now=159)
+        assert dedup.seen_text(CHAT_ID, 3, "Заказ\n**Сумма заказа:** 5000", now=160)
+        assert not dedup.seen_text(CHAT_ID, 4, "Заказ\n**Сумма заказа:** 5000", now=160.5)
+        assert dedup.seen_text(CHAT_ID, 5, "Заказ\n**Сумма заказа:** 5000", now=200)
+        assert not dedup.seen_text(CHAT_ID, 6, "", now=200)
+        assert not dedup.seen_text(CHAT_ID, 7, "", now=200)
+        print("✓ seen_text() catches the same order text within text_ttl")
+
+    def test_same_message_is_not_a_text_hit(self):
+        """The message that recorded a text is not its own duplicate, e.g. when re-checked after an edit"""
+        dedup = MessageDeduplicator(10, 60)
+        assert not dedup.seen_text(CHAT_ID, 1, "order", now=100)
+        assert not dedup.seen_text(CHAT_ID, 2, "other order", now=110)
+        assert not dedup.seen_text(CHAT_ID, 1, "order", now=150)
+        # Seeing it again restarts its window, and moves it behind texts that expire sooner
+        assert dedup.seen_text(CHAT_ID, 3, "order", now=200)
+        assert not dedup.seen_text(CHAT_ID, 4, "other order", now=200)
+        print("✓ seen_text() ignores the message that recorded the text")
+
+    def test_seen_text_size_limit(self):
+        """At most max_size texts are remembered, the oldest dropped first"""
+        dedup = MessageDeduplicator(2, 60)
+        for message_id, text in enumerate(("one", "two", "three")):
+            dedup.seen_text(CHAT_ID, message_id, text, now=100)
+        assert not dedup.seen_text(CHAT_ID, 10, "one", now=100)
+        assert dedup.seen_text(CHAT_ID, 11, "three", now=100)
+        print("✓ seen_text() keeps at most max_size texts")
+
+    def test_stats(self):
+        """stats() counts checks and hits of both kinds"""
+        dedup = MessageDeduplicator(10, 60)
+        dedup.seen_id(CHAT_ID, 1)
+        dedup.seen_id(CHAT_ID, 1)
+        dedup.seen_id(CHAT_ID, 2)
+        dedup.seen_text(CHAT_ID, 1, "order", now=100)
+        dedup.seen_text(CHAT_ID, 2, "order", now=100)
+        assert dedup.stats() == {'checked': 3, 'id_hits': 1, 'text_hits': 1, 'size': 2}
+        print("✓ stats() counts checks and hits")
+
+
+class TestRejectionCache:
+    """RejectionCache lookups, expiry and size limit, with explicit clock values"""
+
+    def test_get_and_discard(self):
+        """get() returns the rule that rejected a message until it is discarded"""
+        cache = RejectionCache(10, 60)
+        cache.add(CHAT_ID, 1, 'amount_range', now=100)
+        assert cache.get(CHAT_ID, 1, now=100) == 'amount_range'
+        assert cache.get(OTHER_CHAT_ID, 1, now=100) is None
+        assert cache.get(CHAT_ID, 2, now=100) is None
+        cache.discard(CHAT_ID, 1)
+        cache.discard(CHAT_ID, 1)
+        assert cache.get(CHAT_ID, 1, now=100) is None
+        assert len(cache) == 0
+        print("✓ get() returns the rejecting rule until discard()")
+
+    def test_expiry(self):
+        """Entries expire ttl seconds after the rejection"""
+        cache = RejectionCache(10, 60)
+        cache.add(CHAT_ID, 1, 'amount_range', now=100)
+        cache.add(CHAT_ID, 2, 'exclude_keywords', now=130)
+        assert cache.get(CHAT_ID, 1, now=160) == 'amount_range'
+        assert cache.get(CHAT_ID, 1, now=160.5) is None
+        assert cache.get(CHAT_ID, 2, now=160.5) == 'exclude_keywords'
+        assert len(cache) == 1
+        print("✓ entries expire ttl seconds after the rejection")
+
+    def test_add_keeps_original_time(self):
+        """Rejecting an edit again updates the rule but not the time, so edits do not extend the window"""
+        cache = RejectionCache(10, 60)
+        cache.add(CHAT_ID, 1, 'amount_range', now=100)
+        cache.add(CHAT_ID, 2, 'amount_range', now=110)
+        cache.add(CHAT_ID, 1, 'exclude_keywords', now=150)
+        assert cache.get(CHAT_ID, 1, now=155) == 'exclude_keywords'
+        assert cache.get(CHAT_ID, 1, now=161) is None
+        assert cache.get(CHAT_ID, 2, now=161) == 'amount_range'
+        print("✓ add() keeps the original rejection time")
+
+    def test_size_limit(self):
+        """At most max_size entries are kept, the oldest rejection dropped first"""
+        cache = RejectionCache(2, 60)
+        for message_id in (1, 2, 3):
+            cache.add(CHAT_ID, message_id, 'amount_range', now=100)
+        assert len(cache) == 2
+        assert cache.get(CHAT_ID, 1, now=100) is None
+        assert cache.get(CHAT_ID, 2, now=100) == 'amount_range'
+        assert cache.get(CHAT_ID, 3, now=100) == 'amount_range'
+        print("✓ at most max_size rejections are kept")
+
+
+def run_all_tests():
+    """Run all deduplication tests"""
+    print("🚀 Starting deduplication tests...")
+    print("=" * 60)
+
+    tests = [
+        (TestMessageDeduplicator(), [
+            'test_seen_id',
+            'test_seen_id_lru',
+            'test_seen_text_window',
+            'test_same_message_is_not_a_text_hit',
+            'test_seen_text_size_limit',
+            'test_stats',
+        ]),
+        (TestRejectionCache(), [
+            'test_get_and_discard',
+            'test_expiry',
+            'test_add_keeps_original_time',
+            'test_size_limit',
+        ]),
+    ]
+
+    passed = 0
+    failed = 0
+    for test_instance, test_methods in tests:
+        for method_name in test_methods:
+            try:
+                print(f"\n🧪 Running {method_name}...")
+                getattr(test_instance, method_name)()
+                print(f"✅ {method_name} - PASSED")
+                passed += 1
+            except Exception as e:
+                print(f"❌ {method_name} - FAILED: {e!r}")
+                failed += 1
+
+    print("\n" + "=" * 60)
+    print(f"📊 Test Results: {passed} passed, {failed} failed")
+    if failed == 0:
+        print("🎉 All tests passed!")
+    else:
+        print(f"⚠️  {failed} test(s) failed")
+    return failed == 0
+
+
+if __name__ == '__main__':
+    sys.exit(0 if run_all_tests() else 1)
@@ -160,6 +160,68 @@ class TestExcludedKeywordsAPI:
         assert data['error'] == 'Keyword already exists'
         print(f"✓ POST /api/excluded_keywords (duplicate): {data}")
     
+    async def test_add_keyword_reports_created(self):
+        """Test add_keyword tells a new keyword from an existing one"""
+        assert await db_manager.add_keyword('spam') is True
+        assert await db_manager.add_keyword(' spam ') is False
+        assert await db_manager.keyword_exists('spam')
+        print("✓ add_keyword: created, then already exists")
+    
+    async def test_post_excluded_keyword_case_duplicate(self):
+        """Test POST /api/excluded_keywords rejects a keyword differing only in case"""
+        await db_manager.add_keyword('Spam')
+        
+        response = await self.client.post('/api/excluded_keywords', json={'keyword': 'SPAM'})
+        assert response.status_code == 400
+        assert await db_manager.keyword_exists('spam')
+        
+        # Removal is case-insensitive as well
+        assert await db_manager.remove_keyword('spam')
+        assert not await db_manager.keyword_exists('Spam')
+        print("✓ POST /api/excluded_keywords (case duplicate)")
+    
+    async def test_post_excluded_keyword_too_long(self):
+        """Test POST /api/excluded_keywords rejects keywords that do not fit, before or after casefolding"""
+        for keyword in ('x' * 256, 'ß' * 128):
+            response = await self.client.post('/api/excluded_keywords', json={'keyword': keyword})
+            assert response.status_code == 400
+            data = await response.get_json()
+            assert 'longer than 255' in data['error']
+            assert not await db_manager.keyword_exists(keyword)
+        
+        response = await self.client.post('/api/excluded_keywords', json={'keyword': 'ß' * 127})
+        assert response.status_code == 200
+        assert await db_manager.remove_keyword('ß' * 127)
+        print("✓ POST /api/excluded_keywords (too long)")
+    
+    async def test_search_excluded_keywords_paginated(self):
+        """Test GET /api/excluded_keywords with q, limit and cursor"""
+        for keyword in self.test_keywords:
+            await db_manager.add_keyword(keyword)
+        
+        response = await self.client.get('/api/excluded_keywords?q=SP')
+        data = await response.get_json()
+        assert response.status_code == 200
+        assert 'spam' in data['keywords']
+        assert 'test_keyword' not in data['keywords']
+        
+        # Walk the test_ prefix one keyword per page
+        seen = []
+        cursor = ''
+        while True:
+            response = await self.client.get(f'/api/excluded_keywords?q=test_&limit=1&cursor={cursor}')
+            data = await response.get_json()
+            seen.extend(data['keywords'])
+            if data['next_cursor'] is None:
+                break
+            cursor = data['next_cursor']
+        assert 'test_keyword' in seen
+        assert len(seen) == len(set(seen))
+        
+        response = await self.client.get('/api/excluded_keywords?limit=abc')
+        assert response.status_code == 400
+        print(f"✓ GET /api/excluded_keywords (search, pagination): {seen}")
+    
     async def test_post_excluded_keyword_unauthorized(self):
         """Test POST /api/excluded_keywords without authentication"""
         # Clear session
@@ -240,6 +302,42 @@ class TestExcludedKeywordsAPI:
         assert not await db_manager.keyword_exists(keyword_with_spaces)
         print(f"✓ DELETE /api/excluded_keywords/{encoded_keyword} (with spaces): {data}")
     
+    async def test_import_excluded_keywords_json(self):
+        """Test POST /api/excluded_keywords/import with a JSON array"""
+        await db_manager.add_keyword('spam')
+        
+        response = await self.client.post(
+            '/api/excluded_keywords/import',
+            json=['spam', ' test_keyword ', 'интеграционный_тест', 'test_keyword', ''],
+            headers={'Content-Type': 'application/json'}
+        )
+        assert response.status_code == 200
+        
+        data = await response.get_json()
+        assert data == {'added': 2, 'existing': 1, 'invalid': 0}
+        assert await db_manager.keyword_exists('test_keyword')
+        assert 'интеграционный_тест' in db_manager.keyword_snapshot
+        print(f"✓ POST /api/excluded_keywords/import (json): {data}")
+    
+    async def test_import_export_excluded_keywords_file(self):
+        """Test importing a CSV upload and exporting it back"""
+        from io import BytesIO
+        from werkzeug.datastructures import FileStorage
+        
+        upload = FileStorage(BytesIO(b'keyword\nspam\ntest_keyword,second column\n'), filename='keywords.csv')
+        response = await self.client.post('/api/excluded_keywords/import', files={'file': upload})
+        assert response.status_code == 200
+        
+        data = await response.get_json()
+        assert data['added'] == 2
+        
+        response = await self.client.get('/api/excluded_keywords/export?format=csv')
+        assert response.status_code == 200
+        lines = (await response.get_data(as_text=True)).splitlines()
+        assert lines[0] == 'keyword'
+        assert 'spam' in lines and 'test_keyword' in lines
+        print(f"✓ POST /api/excluded_keywords/import (csv) and GET /api/excluded_keywords/export: {data}")
+    
     async def test_full_crud_workflow(self):
         """Test complete CRUD workflow for excluded keywords"""
         print("\n=== Testing full CRUD workflow ===")
@@ -299,11 +397,17 @@ async def run_all_tests():
         'test_post_excluded_keyword_empty',
         'test_post_excluded_keyword_whitespace',
         'test_post_excluded_keyword_duplicate',
+        'test_add_keyword_reports_created',
+        'test_post_excluded_keyword_case_duplicate',
+        'test_post_excluded_keyword_too_long',
+        'test_search_excluded_keywords_paginated',
         'test_post_excluded_keyword_unauthorized',
         'test_delete_excluded_keyword_success',
         'test_delete_excluded_keyword_not_found',
         'test_delete_excluded_keyword_unauthorized',
         'test_delete_excluded_keyword_with_spaces',
+        'test_import_excluded_keywords_json',
+        'test_import_export_excluded_keywords_file',
         'test_full_crud_workflow'
     ]
     
@@ -0,0 +1,128 @@
+import random
+import sys
+
+# Add src directory to path
+sys.path.append('./src')
+
+from keyword_matcher import LINEAR_SCAN_LIMIT, KeywordMatcher, normalize
+
+# Small alphabet with case and casefold variants, so random texts hit often
+ALPHABET = 'abAB ßSsёЁеЕİi'
+# Two letters: keywords overlap and share prefixes all the time, exercising failure links
+DENSE_ALPHABET = 'aB'
+SPECIAL_KEYWORDS = ['Straße', 'ЁЖ', '  spam  ', 'SS', 'İ']
+
+
+def naive_find(keywords, text):
+    """Every keyword that occurs in text, compared the way the matcher normalizes"""
+    haystack = text.casefold()
+    return [keyword for keyword in keywords if normalize(keyword) and normalize(keyword) in haystack]
+
+
+def random_text(rng, length, alphabet=ALPHABET):
+    return ''.join(rng.choice(alphabet) for _ in range(length))
+
+
+class TestKeywordMatcher:
+    """KeywordMatcher.find() against a naive substring scan"""
+
+    def check_random(self, size, cases=500, seed=1, alphabet=ALPHABET, lengths=(1, 6)):
+        rng = random.Random(seed)
+        keywords = SPECIAL_KEYWORDS + [
+            random_text(rng, rng.randint(*lengths), alphabet) for _ in range(size - len(SPECIAL_KEYWORDS))
+        ]
+        matcher = KeywordMatcher(keywords)
+        for _ in range(cases):
+            text = random_text(rng, rng.randint(0, 40), alphabet)
+            expected = naive_find(keywords, text)
+            found = matcher.find(text)
+            if expected:
+                # Any matching keyword will do; it must really occur in the text
+                assert found in expected, (text, found, expected)
+            else:
+                assert found is None, (text, found)
+
+    def test_linear_scan(self):
+        """Small sets use the plain scan"""
+        self.check_random(LINEAR_SCAN_LIMIT)
+        self.check_random(LINEAR_SCAN_LIMIT, alphabet=DENSE_ALPHABET, lengths=(7, 12))
+        print(f"✓ find() agrees with a naive scan for {LINEAR_SCAN_LIMIT} keywords (linear scan)")
+
+    def test_automaton(self):
+        """Sets above LINEAR_SCAN_LIMIT use the Aho-Corasick automaton"""
+        for size in (LINEAR_SCAN_LIMIT + 1, 1000):
+            self.check_random(size, seed=size)
+            self.check_random(size, seed=size, alphabet=DENSE_ALPHABET, lengths=(7, 12))
+        print("✓ find() agrees with a naive scan above LINEAR_SCAN_LIMIT (automaton)")
+
+    def test_casefold(self):
+        """Case and casefold differences between keyword and text do not matter"""
+        filler = [f"filler{i}" for i in range(LINEAR_SCAN_LIMIT + 1)]
+        casefolded = ['Straße', 'ЁЖ', '  spam  ']
+        for keywords in (casefolded, casefolded + filler):
+            matcher = KeywordMatcher(keywords)
+            assert matcher.find('ул. STRASSE 5') == 'Straße'
+            assert matcher.find('ёжик') == 'ЁЖ'
+            assert matcher.find('no SPAM please') == '  spam  '
+            assert matcher.find('nothing here') is None
+            assert matcher.find('') is None
+        print("✓ find() ignores case and casefold differences")
+
+    def test_overlapping_keywords(self):
+        """A keyword inside another, or ending where another fails, is still found"""
+        keywords = ['abcd', 'bc', 'bcde', 'xabcy'] + [f"filler{i}" for i in range(LINEAR_SCAN_LIMIT + 1)]
+        matcher = KeywordMatcher(keywords)
+        assert matcher.find('zabcz') == 'bc'
+        assert matcher.find('xabcx') == 'bc'
+        assert matcher.find('abce') == 'bc'
+        assert matcher.find('ab cd') is None
+        # The failure link of "baa" has to skip state "a" (no "aa" edge) and fall back to the root
+        matcher = KeywordMatcher(['ab', 'baaa'] + [f"filler{i}" for i in range(LINEAR_SCAN_LIMIT + 1)])
+        assert matcher.find('baab') == 'ab'
+        print("✓ find() handles overlapping keywords")
+
+    def test_first_spelling_wins(self):
+        """Keywords equal after normalization are kept once, under the first spelling"""
+        matcher = KeywordMatcher(['Spam', 'spam', ' SPAM', '', '   '])
+        assert len(matcher) == 1
+        assert matcher.find('spam!') == 'Spam'
+        print("✓ duplicate spellings are merged, blank keywords ignored")
+
+
+def run_all_tests():
+    """Run all keyword matcher tests"""
+    print("🚀 Starting keyword matcher tests...")
+    print("=" * 60)
+
+    test_instance = TestKeywordMatcher()
+    test_methods = [
+        'test_linear_scan',
+        'test_automaton',
+        'test_casefold',
+        'test_overlapping_keywords',
+        'test_first_spelling_wins',
+    ]
+
+    passed = 0
+    failed = 0
+    for method_name in test_methods:
+        try:
+            print(f"\n🧪 Running {method_name}...")
+            getattr(test_instance, method_name)()
+            print(f"✅ {method_name} - PASSED")
+            passed += 1
+        except Exception as e:
+            print(f"❌ {method_name} - FAILED: {e!r}")
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print(f"📊 Test Results: {passed} passed, {failed} failed")
+    if failed == 0:
+        print("🎉 All tests passed!")
+    else:
+        print(f"⚠️  {failed} test(s) failed")
+    return failed == 0
+
+
+if __name__ == '__main__':
+    sys.exit(0 if run_all_tests() else 1)
@@ -0,0 +1,142 @@
+import os
+import sys
+import tempfile
+
+# Add src directory to path
+sys.path.append('./src')
+
+import log_tail
+from log_tail import read_tail
+
+
+class TestLogTail:
+    """read_tail() cursors across appends, partial lines, rotation and truncation"""
+
+    def setup_method(self, method=None):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'app.log')
+        open(self.path, 'wb').close()
+
+    def teardown_method(self, method=None):
+        self.directory.cleanup()
+
+    def write(self, text, mode='a'):
+        with open(self.path, mode, encoding='utf-8') as f:
+            f.write(text)
+
+    def test_first_read_returns_last_lines(self):
+        """Without a cursor the last max_lines lines are returned, flagged as truncated"""
+        self.write(''.join(f"line {i}\n" for i in range(10)))
+        result = read_tail(self.path, None, 3)
+        assert result['lines'] == ['line 7', 'line 8', 'line 9']
+        assert result['truncated']
+
+        result = read_tail(self.path, None, 50)
+        assert len(result['lines']) == 10
+        assert not result['truncated']
+        print("✓ first read returns the last lines")
+
+    def test_cursor_returns_only_new_lines(self):
+        """A cursor returns only what was appended after it"""
+        self.write("one\ntwo\n")
+        cursor = read_tail(self.path, None, 10)['cursor']
+        assert read_tail(self.path, cursor, 10)['lines'] == []
+
+        self.write("three\nfour\n")
+        result = read_tail(self.path, cursor, 10)
+        assert result['lines'] == ['three', 'four']
+        assert not result['truncated']
+        print("✓ cursor returns only new lines")
+
+    def test_partial_line_waits(self):
+        """A line without its newline yet is returned once it is complete"""
+        self.write("done\nhalf")
+        result = read_tail(self.path, None, 10)
+        assert result['lines'] == ['done']
+
+        self.write(" a line\n")
+        assert read_tail(self.path, result['cursor'], 10)['lines'] == ['half a line']
+
+        empty = tempfile.NamedTemporaryFile(dir=self.directory.name, delete=False)
+        empty.write(b"no newline yet")
+        empty.close()
+        result = read_tail(empty.name, None, 10)
+        assert result['lines'] == [] and not result['truncated']
+        print("✓ partial lines wait for their newline")
+
+    def test_rotation_and_truncation_restart(self):
+        """A cursor from a rotated (new inode) or truncated file reads the new file from the start"""
+        self.write("old 1\nold 2\n")
+        cursor = read_tail(self.path, None, 10)['cursor']
+
+        os.rename(self.path, self.path + '.1')
+        self.write("new 1\n", mode='w')
+        assert read_tail(self.path, cursor, 10)['lines'] == ['new 1']
+
+        self.write("much longer content than before\nsecond\n")
+        cursor = read_tail(self.path, None, 10)['cursor']
+        self.write("short\n", mode='w')
+        assert read_tail(self.path, cursor, 10)['lines'] == ['short']
+
+        assert read_tail(self.path, 'garbage', 10)['lines'] == ['short']
+        print("✓ rotation and truncation restart from the beginning")
+
+    def test_reads_across_chunks(self):
+        """Lines spanning several read chunks come back whole and in order"""
+        chunk_size = log_tail.CHUNK_SIZE
+        log_tail.CHUNK_SIZE = 16
+        try:
+            lines = [f"message {i} " + 'x' * (i % 7) for i in range(40)]
+            self.write(''.join(line + '\n' for line in lines))
+            assert read_tail(self.path, None, 100)['lines'] == lines
+            assert read_tail(self.path, None, 5)['lines'] == lines[-5:]
+
+            cursor = read_tail(self.path, None, 1)['cursor']
+            self.write("привет, мир\n")
+            assert read_tail(self.path, cursor, 10)['lines'] == ['привет, мир']
+        finally:
+            log_tail.CHUNK_SIZE = chunk_size
+        print("✓ lines spanning read chunks are reassembled")
+
+
+def run_all_tests():
+    """Run all log tail tests"""
+    print("🚀 Starting log tail tests...")
+    print("=" * 60)
+
+    test_instance = TestLogTail()
+    test_methods = [
+        'test_first_read_returns_last_lines',
+        'test_cursor_returns_only_new_lines',
+        'test_partial_line_waits',
+        'test_rotation_and_truncation_restart',
+        'test_reads_across_chunks',
+    ]
+
+    passed = 0
+    failed = 0
+    for method_name in test_methods:
+        try:
+            print(f"\n🧪 Running {method_name}...")
+            test_instance.setup_method()
+            try:
+                getattr(test_instance, method_name)()
+            finally:
+                test_instance.teardown_method()
+            print(f"✅ {method_name} - PASSED")
+            passed += 1
+        except Exception as e:
+            print(f"❌ {method_name} - FAILED: {e!r}")
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print(f"📊 Test Results: {passed} passed, {failed} failed")
+    if failed == 0:
+        print("🎉 All tests passed!")
+    else:
+        print(f"⚠️  {failed} test(s) failed")
+    return failed == 0
+
+
+if __name__ == '__main__':
+    sys.exit(0 if run_all_tests() else 1)
@@ -0,0 +1,104 @@
+import io
+import json
+import logging
+import os
+import queue
+import sys
+from logging.handlers import QueueListener
+
+os.environ.setdefault('API_ID', '0')
+# Add src directory to path
+sys.path.append('./src')
+
+from logging_setup import TEXT_FORMAT, JsonLinesFormatter, StructuredQueueHandler
+
+
+class TestLoggingSetup:
+    """Records passed through StructuredQueueHandler and a QueueListener, as configure_logging() wires them"""
+
+    def log_through_queue(self, formatter, log):
+        output = io.StringIO()
+        handler = logging.StreamHandler(output)
+        handler.setFormatter(formatter)
+        log_queue = queue.SimpleQueue()
+        listener = QueueListener(log_queue, handler)
+        logger = logging.getLogger('test_logging_setup')
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        queue_handler = StructuredQueueHandler(log_queue)
+        logger.addHandler(queue_handler)
+        listener.start()
+        try:
+            log(logger)
+        finally:
+            listener.stop()
+            logger.removeHandler(queue_handler)
+        return output.getvalue().splitlines()
+
+    def test_json_exception_field(self):
+        """The traceback goes to "exc", and "message" is only the message"""
+        def log(logger):
+            try:
+                raise ValueError("broken order")
+            except ValueError:
+                logger.error("Handling failed for %s", 'order 7', exc_info=True)
+            logger.info("Plain %d", 1)
+
+        lines = self.log_through_queue(JsonLinesFormatter(), log)
+        assert len(lines) == 2
+        failed, plain = (json.loads(line) for line in lines)
+        assert failed['message'] == 'Handling failed for order 7'
+        assert failed['level'] == 'ERROR'
+        assert failed['exc'].startswith('Traceback') and 'ValueError: broken order' in failed['exc']
+        assert plain['message'] == 'Plain 1' and 'exc' not in plain
+        print("✓ JSON lines keep the traceback in its own field")
+
+    def test_text_keeps_traceback(self):
+        """The text format still shows the traceback after the message"""
+        def log(logger):
+            try:
+                raise ValueError("broken order")
+            except ValueError:
+                logger.exception("Handling failed")
+
+        lines = self.log_through_queue(logging.Formatter(TEXT_FORMAT), log)
+        assert lines[0].endswith(' - ERROR - Handling failed')
+        assert lines[1] == 'Traceback (most recent call last):'
+        assert lines[-1] == 'ValueError: broken order'
+        print("✓ text lines show the traceback after the message")
+
+
+def run_all_tests():
+    """Run all logging setup tests"""
+    print("🚀 Starting logging setup tests...")
+    print("=" * 60)
+
+    test_instance = TestLoggingSetup()
+    test_methods = [
+        'test_json_exception_field',
+        'test_text_keeps_traceback',
+    ]
+
+    passed = 0
+    failed = 0
+    for method_name in test_methods:
+        try:
+            print(f"\n🧪 Running {method_name}...")
+            getattr(test_instance, method_name)()
+            print(f"✅ {method_name} - PASSED")
+            passed += 1
+        except Exception as e:
+            print(f"❌ {method_name} - FAILED: {e!r}")
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print(f"📊 Test Results: {passed} passed, {failed} failed")
+    if failed == 0:
+        print("🎉 All tests passed!")
+    else:
+        print(f"⚠️  {failed} test(s) failed")
+    return failed == 0
+
+
+if __name__ == '__main__':
+    sys.exit(0 if run_all_tests() else 1)
@@ -0,0 +1,236 @@
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+os.environ.setdefault('API_ID', '0')
+# Add src directory to path
+sys.path.append('./src')
+
+from message_queue import MessageQueue
+from metrics import metrics
+
+
+def order_text(amount):
+    return f"Заказ\n**Сумма заказа:** {amount}\n" if amount is not None else "Коллеги, привет"
+
+
+class FakeMessage:
+    def __init__(self, message_id, text):
+        self.id = message_id
+        self.text = text
+        self.date = None
+
+
+class FakeEvent:
+    def __init__(self, name, amount=None):
+        self.name = name
+        self.chat_id = -1001
+        self.message = FakeMessage(name, order_text(amount))
+
+
+async def ignore(event, route, trace):
+    pass
+
+
+class TestMessageQueue:
+    """MessageQueue ordering, eviction and age cap, driven through _pop() without workers"""
+
+    def make_queue(self, maxsize=10, age_cap_ms=60_000):
+        return MessageQueue(ignore, maxsize, 1, age_cap_ms)
+
+    def drain(self, queue):
+        served = []
+        while queue.stats()['depth']:
+            served.append(queue._pop().event.name)
+        return served
+
+    def test_highest_amount_first(self):
+        """Orders are served by amount, highest first; equal amounts in arrival order; no amount last"""
+        queue = self.make_queue()
+        for name, amount in [('a', 100), ('chatter', None), ('b', 5000), ('c', 300), ('d', 300)]:
+            queue.submit(FakeEvent(name, amount), None)
+        assert self.drain(queue) == ['b', 'c', 'd', 'a', 'chatter']
+
+        names = [f"same{i}" for i in range(8)]
+        for i, name in enumerate(names):
+            queue.submit(FakeEvent(name, 700), None)
+            queue.submit(FakeEvent(f"other{i}", 100 * i), None)
+        assert [name for name in self.drain(queue) if name.startswith('same')] == names
+        print("✓ served by amount, FIFO within an amount, non-orders last")
+
+    def test_full_queue_evicts_lowest(self):
+        """When full, a higher-priority message evicts the lowest one; a lower one is dropped itself"""
+        queue = self.make_queue(maxsize=3)
+        for name, amount in [('a', 200), ('chatter', None), ('b', 300)]:
+            queue.submit(FakeEvent(name, amount), None)
+        queue.submit(FakeEvent('big', 1000), None)  # evicts the message without an amount
+        queue.submit(FakeEvent('small', 50), None)  # lower than everything queued: dropped
+        queue.submit(FakeEvent('mid', 250), None)   # evicts 'a'
+        stats = queue.stats()
+        assert stats['depth'] == 3
+        assert stats['dropped'] == 3
+        assert stats['enqueued'] == 5
+        assert self.drain(queue) == ['big', 'b', 'mid']
+        print("✓ full queue evicts the lowest priority message")
+
+    def test_lazy_removal_and_compaction(self):
+        """Evicted entries are skipped when popped, and compaction keeps the heap bounded"""
+        queue = self.make_queue(maxsize=5)
+        for amount in range(100):
+            queue.submit(FakeEvent(f"order{amount}", amount), None)
+            assert len(queue._heap) <= 2 * 5
+            assert len(queue._arrivals) <= 2 * 5
+        assert queue.stats()['depth'] == 5
+        assert self.drain(queue) == [f"order{amount}" for amount in range(99, 94, -1)]
+        # The last pop clears what is left of lazily removed entries
+        assert not queue._heap and not queue._arrivals
+        print("✓ evicted entries are skipped and compacted away")
+
+    def test_age_cap_serves_oldest(self):
+        """A message older than the age cap is served before higher amounts"""
+        queue = self.make_queue(age_cap_ms=1000)
+        queue.submit(FakeEvent('old', 10), None)
+        queue.submit(FakeEvent('big', 10_000), None)
+        queue.submit(FakeEvent('mid', 500), None)
+        queue._arrivals[0].enqueued_at = time.monotonic() - 2
+        assert self.drain(queue) == ['old', 'big', 'mid']
+        assert queue.stats()['served_by_age'] == 1
+
+        # Served by age while also at the top of the heap: it must not be served twice
+        queue.submit(FakeEvent('old_big', 10_000), None)
+        queue.submit(FakeEvent('mid', 500), None)
+        queue._arrivals[0].enqueued_at = time.monotonic() - 2
+        assert self.drain(queue) == ['old_big', 'mid']
+        print("✓ age cap serves the oldest message first")
+
+    def test_age_cap_skips_removed(self):
+        """An old entry that was already served by amount does not count for the age cap"""
+        queue = self.make_queue(age_cap_ms=1000)
+        queue.submit(FakeEvent('first', 10_000), None)
+        queue.submit(FakeEvent('second', 10), None)
+        queue.submit(FakeEvent('third', 500), None)
+        assert queue._pop().event.name == 'first'
+        # 'first' is still at the head of the arrivals, lazily removed
+        for entry in queue._arrivals:
+            entry.enqueued_at = time.monotonic() - 2
+        assert self.drain(queue) == ['second', 'third']
+        assert queue.stats()['served_by_age'] == 2
+        print("✓ age cap ignores entries already served")
+
+    def test_replace_edited(self):
+        """An edit of a queued message replaces it, keeping its arrival but taking the edited amount"""
+        queue = self.make_queue(age_cap_ms=1000)
+        for name, amount in [('a', 10), ('b', 500), ('c', 300)]:
+            queue.submit(FakeEvent(name, amount), None)
+        assert queue.replace(-1001, FakeMessage('a', order_text(1000)))
+        assert not queue.replace(-1001, FakeMessage('missing', order_text(1000)))
+        assert not queue.replace(-1002, FakeMessage('b', order_text(1000)))
+        assert queue.stats()['depth'] == 3
+        served = []
+        while queue.stats()['depth']:
+            entry = queue._pop()
+            served.append((entry.event.name, entry.event.message.text))
+        assert served == [('a', order_text(1000)), ('b', order_text(500)), ('c', order_text(300))]
+
+        # An entry that waited past the age cap keeps its arrival time when edited
+        queue.submit(FakeEvent('old', 10), None)
+        queue.submit(FakeEvent('big', 10_000), None)
+        queue._arrivals[0].enqueued_at = time.monotonic() - 2
+        assert queue.replace(-1001, FakeMessage('old', order_text(20)))
+        assert self.drain(queue) == ['old', 'big']
+        assert queue.stats()['served_by_age'] == 1
+
+        # Served messages can no longer be replaced
+        queue.submit(FakeEvent('done', 10), None)
+        queue._pop()
+        assert not queue.replace(-1001, FakeMessage('done', order_text(20)))
+        print("✓ edits replace queued messages in place")
+
+    def test_backfill_delivery_stage(self):
+        """Backfilled messages record their delivery latency apart from live ones"""
+        def totals():
+            snapshot = metrics.snapshot()
+            return tuple(snapshot.get(stage, {}).get('total', 0) for stage in ('delivery', 'backfill_delivery'))
+
+        queue = self.make_queue()
+        live, backfilled = FakeEvent('live', 100), FakeEvent('backfilled', 100)
+        live.message.date = backfilled.message.date = datetime.now(timezone.utc)
+        delivery, backfill_delivery = totals()
+        queue.submit(live, None)
+        assert totals() == (delivery + 1, backfill_delivery)
+        queue.submit(backfilled, None, 'backfill_delivery')
+        assert totals() == (delivery + 1, backfill_delivery + 1)
+        print("✓ backfilled messages are recorded as backfill_delivery")
+
+    def test_workers(self):
+        """Workers handle every message, survive handler errors and stop cleanly"""
+        async def run():
+            handled = []
+            done = asyncio.Event()
+
+            async def handler(event, route, trace):
+                handled.append(event.name)
+                if event.name == 'boom':
+                    raise RuntimeError('handler failure')
+                if len(handled) == 4:
+                    done.set()
+
+            queue = MessageQueue(handler, 10, 2, 60_000)
+            queue.start()
+            for name, amount in [('a', 1), ('boom', 2), ('b', 3), ('c', None)]:
+                queue.submit(FakeEvent(name, amount), 'route')
+            await asyncio.wait_for(done.wait(), 1)
+            await asyncio.sleep(0)
+            stats = queue.stats()
+            await queue.stop()
+            return handled, stats, queue.stats()
+
+        handled, stats, stopped = asyncio.run(run())
+        assert sorted(handled) == ['a', 'b', 'boom', 'c']
+        assert stats['processed'] == 4 and stats['depth'] == 0
+        assert stopped['workers'] == 0
+        print("✓ workers handle all messages and survive handler errors")
+
+
+def run_all_tests():
+    """Run all message queue tests"""
+    print("🚀 Starting message queue tests...")
+    print("=" * 60)
+
+    test_instance = TestMessageQueue()
+    test_methods = [
+        'test_highest_amount_first',
+        'test_full_queue_evicts_lowest',
+        'test_lazy_removal_and_compaction',
+        'test_age_cap_serves_oldest',
+        'test_age_cap_skips_removed',
+        'test_replace_edited',
+        'test_backfill_delivery_stage',
+        'test_workers',
+    ]
+
+    passed = 0
+    failed = 0
+    for method_name in test_methods:
+        try:
+            print(f"\n🧪 Running {method_name}...")
+            getattr(test_instance, method_name)()
+            print(f"✅ {method_name} - PASSED")
+            passed += 1
+        except Exception as e:
+            print(f"❌ {method_name} - FAILED: {e!r}")
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print(f"📊 Test Results: {passed} passed, {failed} failed")
+    if failed == 0:
+        print("🎉 All tests passed!")
+    else:
+        print(f"⚠️  {failed} test(s) failed")
+    return failed == 0
+
+
+if __name__ == '__main__':
+    sys.exit(0 if run_all_tests() else 1)
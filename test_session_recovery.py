@@ -0,0 +1,292 @@
+import asyncio
+import os
+import sys
+import tempfile
+
+os.environ.setdefault('API_ID', '0')
+# Add src directory to path
+sys.path.append('./src')
+
+import bot as bot_module
+import fake_telegram
+from backfill import ChatCursors
+from bot import BotManager
+from config import Config
+from fake_telegram import FakeTelegramServer
+from telethon import events
+
+CHAT_ID = -1001234567890
+# Settings for a quiet fake Telegram: no synthetic traffic or failures, and no probes during the test
+SETTINGS = {
+    'FAKE_TELEGRAM': True,
+    'FAKE_TELEGRAM_RATE': 0,
+    'FAKE_TELEGRAM_LATENCY_MS': 1,
+    'FAKE_TELEGRAM_FLOOD_RATE': 0,
+    'FAKE_TELEGRAM_DISCONNECT_EVERY': 0,
+    'FAKE_TELEGRAM_REVOKE_AFTER': 0,
+    'WARM_STANDBY': True,
+    'BACKFILL_MAX_AGE': 0,
+    'CONNECTION_CHECK_INTERVAL': 3600,
+    'ROUTES': [{'chat_id': CHAT_ID, 'rules': [{'type': 'amount_range', 'min': 1000}], 'targets': ['dispatcher']}],
+}
+
+
+class MemoryCursors(ChatCursors):
+    """Message cursors kept in memory only"""
+
+    async def load(self):
+        pass
+
+    async def flush(self):
+        pass
+
+
+def order(number, amount):
+    return f"**Новый заказ** №{number}\n**Сумма заказа:** {amount}\n"
+
+
+async def wait_until(condition, timeout=2):
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("Condition not met in time")
+
+
+class TestSessionRecovery:
+    """Session recovery with WARM_STANDBY against the in-process fake Telegram"""
+
+    def setup_method(self, method=None):
+        self.saved = {name: getattr(Config, name) for name in SETTINGS}
+        for name, value in SETTINGS.items():
+            setattr(Config, name, value)
+        self.saved_server = fake_telegram.fake_server
+        self.server = fake_telegram.fake_server = FakeTelegramServer()
+        # Sessions are saved under the working directory
+        self.cwd = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()
+        os.chdir(self.directory.name)
+
+    def teardown_method(self, method=None):
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+        fake_telegram.fake_server = self.saved_server
+        for name, value in self.saved.items():
+            setattr(Config, name, value)
+
+    async def start_bot(self):
+        bot = BotManager()
+        bot.cursors = MemoryCursors(bot.name)
+        await bot.start_login('+100')
+        await bot.verify_code('12345')
+        await wait_until(lambda: bot._standby is not None)
+        return bot
+
+    async def stop_bot(self, bot):
+        bot._connection_monitor_task.cancel()
+        await bot.queue.stop()
+        await bot._drop_standby()
+        await bot.client.disconnect()
+        self.server.stop()
+
+    async def take_order(self, number, edited=False, queue=None):
+        """Post an order, directly or as an edit of a rejected post; returns the client that clicked it
+
+        With a queue, its workers are paused until the edit has arrived, so the post is edited
+        while still waiting in the queue rather than after being rejected.
+        """
+        clicks = len(self.server.clicks)
+        if edited:
+            if queue is not None:
+                workers, queue._workers = queue._workers, []
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+            message = self.server.post(CHAT_ID, order(number, 10))
+            if queue is not None:
+                await wait_until(lambda: queue.stats()['depth'] == 1)
+            await asyncio.sleep(0.05)
+            assert len(self.server.clicks) == clicks
+            self.server.edit(CHAT_ID, message.id, order(number, 5000))
+            if queue is not None:
+                await asyncio.sleep(0.05)
+                assert queue.stats()['depth'] == 1
+                queue.start()
+        else:
+            message = self.server.post(CHAT_ID, order(number, 5000))
+        await wait_until(lambda: len(self.server.clicks) > clicks
+                         and any(forward[2] == message.id for forward in self.server.forwards))
+        label, _, message_id, _ = self.server.clicks[-1]
+        assert message_id == message.id
+        return label
+
+    def test_recovery_swaps_in_standby(self):
+        """Recovery makes the warm standby the active client and retires the old one"""
+        async def run():
+            bot = await self.start_bot()
+            try:
+                old, standby = bot.client, bot._standby
+                assert standby is not old and standby.is_connected()
+
+                user_info = await bot._attempt_session_recovery()
+                assert user_info == {'first_name': 'Fake'}
+                assert bot.client is standby
+                assert not old.is_connected()
+                assert old not in self.server.clients
+                # A new standby is prepared for the next recovery
+                await wait_until(lambda: bot._standby is not None)
+                assert bot._standby not in (old, standby)
+            finally:
+                await self.stop_bot(bot)
+
+        asyncio.run(run())
+        print("✓ recovery swaps in the warm standby and disconnects the old client")
+
+    def test_recovery_moves_handlers(self):
+        """Both the NewMessage and the MessageEdited handler move to the new client"""
+        async def run():
+            bot = await self.start_bot()
+            try:
+                old = bot.client
+                expected = sorted(type(builder).__name__ for _, builder in old.list_event_handlers())
+                assert expected == ['MessageEdited', 'NewMessage']
+
+                await bot._attempt_session_recovery()
+                assert old.list_event_handlers() == []
+                moved = bot.client.list_event_handlers()
+                assert sorted(type(builder).__name__ for _, builder in moved) == expected
+                assert {callback for callback, _ in moved} == {callback for callback, _ in bot._handlers}
+                assert all(isinstance(builder, (events.NewMessage, events.MessageEdited)) for _, builder in moved)
+            finally:
+                await self.stop_bot(bot)
+
+        asyncio.run(run())
+        print("✓ NewMessage and MessageEdited handlers move to the new client")
+
+    def test_orders_keep_flowing(self):
+        """Orders, new and edited, are clicked and forwarded before and after recovery, also when edited while queued"""
+        async def run():
+            bot = await self.start_bot()
+            try:
+                old = bot.client
+                assert await self.take_order(1) == old.label
+                assert await self.take_order(2, edited=True) == old.label
+
+                await bot._attempt_session_recovery()
+                assert bot.client is not old
+                assert await self.take_order(3) == bot.client.label
+                assert await self.take_order(4, edited=True) == bot.client.label
+                assert await self.take_order(5, edited=True, queue=bot.queue) == bot.client.label
+                return self.server.stats()
+            finally:
+                await self.stop_bot(bot)
+
+        stats = asyncio.run(run())
+        assert stats['clicks'] == 5 and stats['forwards'] == 5
+        print("✓ orders keep being clicked and forwarded after recovery")
+
+    def test_unauthorized_order_not_remembered(self):
+        """An order dropped while unauthorized does not suppress its cross-post once authorized again"""
+        async def run():
+            bot = await self.start_bot()
+            try:
+                bot._authorized = False
+                self.server.post(CHAT_ID, order(1, 5000))
+                await asyncio.sleep(0.05)
+                assert self.server.stats()['clicks'] == 0
+
+                bot._authorized = True
+                cross_post = self.server.post(CHAT_ID, order(1, 5000))
+                await wait_until(lambda: [click[2] for click in self.server.clicks] == [cross_post.id])
+                assert bot.dedup.stats()['text_hits'] == 0
+            finally:
+                await self.stop_bot(bot)
+
+        asyncio.run(run())
+        print("✓ orders dropped while unauthorized are not remembered as handled")
+
+    def test_drop_during_backfill(self):
+        """Orders missed in an outage that starts while the previous one is being backfilled are backfilled too"""
+        Config.BACKFILL_MAX_AGE = 300
+        fetch_gap = bot_module.fetch_gap
+
+        async def run():
+            bot = await self.start_bot()
+            # Outages are driven by hand, as the monitor would handle them
+            bot._connection_monitor_task.cancel()
+            try:
+                await self.take_order(1)
+                client = bot.client
+                missed = []
+
+                async def outage():
+                    client.drop()
+                    bot.cursors.mark_gap()
+                    missed.append(self.server.post(CHAT_ID, order(len(missed) + 2, 5000)).id)
+                    await client.connect()
+
+                async def fetch_then_drop(*args):
+                    messages = await fetch_gap(*args)
+                    if len(missed) == 1:
+                        await outage()
+                    return messages
+
+                bot_module.fetch_gap = fetch_then_drop
+                await outage()
+                await bot._backfill()
+                # The pass after reconnecting from the second outage
+                await bot._backfill()
+                assert len(missed) == 2
+                await wait_until(lambda: set(missed) <= {click[2] for click in self.server.clicks})
+                await asyncio.sleep(0.05)
+                return self.server.stats()
+            finally:
+                bot_module.fetch_gap = fetch_gap
+                await self.stop_bot(bot)
+
+        stats = asyncio.run(run())
+        assert stats['clicks'] == 3 and stats['forwards'] == 3
+        print("✓ a second outage during backfill is backfilled on the next pass")
+
+
+def run_all_tests():
+    """Run all session recovery tests"""
+    print("🚀 Starting session recovery tests...")
+    print("=" * 60)
+
+    test_instance = TestSessionRecovery()
+    test_methods = [
+        'test_recovery_swaps_in_standby',
+        'test_recovery_moves_handlers',
+        'test_orders_keep_flowing',
+        'test_unauthorized_order_not_remembered',
+        'test_drop_during_backfill',
+    ]
+
+    passed = 0
+    failed = 0
+    for method_name in test_methods:
+        try:
+            print(f"\n🧪 Running {method_name}...")
+            test_instance.setup_method()
+            try:
+                getattr(test_instance, method_name)()
+            finally:
+                test_instance.teardown_method()
+            print(f"✅ {method_name} - PASSED")
+            passed += 1
+        except Exception as e:
+            print(f"❌ {method_name} - FAILED: {e!r}")
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print(f"📊 Test Results: {passed} passed, {failed} failed")
+    if failed == 0:
+        print("🎉 All tests passed!")
+    else:
+        print(f"⚠️  {failed} test(s) failed")
+    return failed == 0
+
+
+if __name__ == '__main__':
+    sys.exit(0 if run_all_tests() else 1)
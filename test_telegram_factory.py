@@ -0,0 +1,111 @@
+import asyncio
+import os
+import sys
+import traceback
+
+os.environ.setdefault('API_ID', '0')
+# Add src directory to path
+sys.path.append('./src')
+
+from telethon.errors import AuthKeyUnregisteredError
+from telegram_factory import TelegramClientFactory
+
+
+class FakeClient:
+    """Counts get_me() requests and fails them with the queued errors, then returns a user"""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.requests = 0
+
+    async def get_me(self):
+        self.requests += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return 'user'
+
+
+class TestGetMe:
+    """TelegramClientFactory.get_me() caching of users and errors"""
+
+    def test_user_cached(self):
+        """A user is reused within max_age, and fetched again with max_age=0"""
+        async def run():
+            client = FakeClient()
+            assert await TelegramClientFactory.get_me(client) == 'user'
+            assert await TelegramClientFactory.get_me(client, max_age=60) == 'user'
+            assert client.requests == 1
+            assert await TelegramClientFactory.get_me(client, max_age=0) == 'user'
+            assert client.requests == 2
+
+        asyncio.run(run())
+        print("✓ users are cached for max_age")
+
+    def test_network_error_not_cached(self):
+        """A network error is raised to the caller, and the next call asks Telegram again"""
+        async def run():
+            client = FakeClient(ConnectionError("Connection to Telegram lost"))
+            try:
+                await TelegramClientFactory.get_me(client, max_age=60)
+                assert False, "ConnectionError expected"
+            except ConnectionError:
+                pass
+            assert await TelegramClientFactory.get_me(client, max_age=60) == 'user'
+            assert client.requests == 2
+
+        asyncio.run(run())
+        print("✓ network errors are retried, not cached")
+
+    def test_auth_error_cached(self):
+        """An auth error is reused within max_age, without its traceback growing on each raise"""
+        async def run():
+            client = FakeClient(AuthKeyUnregisteredError(request=None))
+            depths = []
+            for _ in range(5):
+                try:
+                    await TelegramClientFactory.get_me(client, max_age=60)
+                    assert False, "AuthKeyUnregisteredError expected"
+                except AuthKeyUnregisteredError as e:
+                    depths.append(len(traceback.extract_tb(e.__traceback__)))
+            assert client.requests == 1
+            assert len(set(depths)) == 1, depths
+
+        asyncio.run(run())
+        print("✓ auth errors are cached and raised with a fresh traceback")
+
+
+def run_all_tests():
+    """Run all Telegram client factory tests"""
+    print("🚀 Starting Telegram client factory tests...")
+    print("=" * 60)
+
+    test_instance = TestGetMe()
+    test_methods = [
+        'test_user_cached',
+        'test_network_error_not_cached',
+        'test_auth_error_cached',
+    ]
+
+    passed = 0
+    failed = 0
+    for method_name in test_methods:
+        try:
+            print(f"\n🧪 Running {method_name}...")
+            getattr(test_instance, method_name)()
+            print(f"✅ {method_name} - PASSED")
+            passed += 1
+        except Exception as e:
+            print(f"❌ {method_name} - FAILED: {e!r}")
+            failed += 1
+
+    print("\n" + "=" * 60)
+    print(f"📊 Test Results: {passed} passed, {failed} failed")
+    if failed == 0:
+        print("🎉 All tests passed!")
+    else:
+        print(f"⚠️  {failed} test(s) failed")
+    return failed == 0
+
+
+if __name__ == '__main__':
+    sys.exit(0 if run_all_tests() else 1)